@@ -4,7 +4,9 @@ Import from coating_service for new code. Uses comprehensive 50+ coating library
 and user-defined coatings from database.
 """
 
-from typing import Any, Dict, List, Optional
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from coating_service import CoatingService, get_coating_service, _interpolate_table
 from coating_db import get_all_user_coatings
@@ -13,6 +15,48 @@ from coating_db import get_all_user_coatings
 COATING_TYPE_AR = "AR"
 COATING_TYPE_HR = "HR"
 
+# Cached CoatingService: rebuilt only when the set of user coatings changes.
+# The database is re-checked at most once per _SERVICE_TTL_S seconds.
+_SERVICE_TTL_S = 2.0
+_svc_cache: Dict[str, Any] = {"sig": None, "svc": None, "checked_at": 0.0}
+
+
+def _user_signature(user: List[Dict[str, Any]]) -> tuple:
+    """Cheap signature of user coatings (count + ids) for cache invalidation."""
+    return (len(user), tuple(c.get("id") for c in user))
+
+
+def _get_cached_service() -> CoatingService:
+    """Return the shared CoatingService, reloading user coatings when stale."""
+    now = time.monotonic()
+    svc = _svc_cache["svc"]
+    if svc is not None and now - _svc_cache["checked_at"] < _SERVICE_TTL_S:
+        return svc
+    user = get_all_user_coatings()
+    sig = _user_signature(user)
+    if svc is None or sig != _svc_cache["sig"]:
+        svc = get_coating_service(user)
+        _svc_cache["svc"] = svc
+        _svc_cache["sig"] = sig
+        _reflectivity_cached.cache_clear()
+        _dropdown_cached.cache_clear()
+    _svc_cache["checked_at"] = now
+    return svc
+
+
+def invalidate_coating_cache() -> None:
+    """Drop the cached service so the next lookup reloads user coatings (call after DB writes)."""
+    _svc_cache["svc"] = None
+    _svc_cache["sig"] = None
+    _reflectivity_cached.cache_clear()
+    _dropdown_cached.cache_clear()
+
+
+@lru_cache(maxsize=4096)
+def _reflectivity_cached(coating_name: Optional[str], lambda_nm: float) -> float:
+    """R(λ) memoized per (coating, λ rounded to 0.01 nm); cleared when the service is rebuilt."""
+    return _get_cached_service().get_reflectivity(coating_name, lambda_nm)
+
 
 def reflectivity_from_surface(surface: Dict[str, Any], lambda_nm: float) -> Optional[float]:
     """
@@ -46,24 +90,27 @@ def is_hr_from_surface(surface: Dict[str, Any]) -> Optional[bool]:
 
 def get_reflectivity(coating_name: Optional[str], lambda_nm: float) -> float:
     """Return R(λ) for coating. Uses uncoated ~4% if unknown."""
-    user = get_all_user_coatings()
-    svc = get_coating_service(user)
-    return svc.get_reflectivity(coating_name, lambda_nm)
+    _get_cached_service()
+    return _reflectivity_cached(coating_name, round(float(lambda_nm), 2))
 
 
 def is_hr_coating(coating_name: Optional[str]) -> bool:
     """True if coating is HR (reflects instead of refracts)."""
-    user = get_all_user_coatings()
-    svc = get_coating_service(user)
+    svc = _get_cached_service()
     return svc.is_hr_coating(coating_name)
 
 
+@lru_cache(maxsize=4)
+def _dropdown_cached(user_sig: tuple) -> Tuple[Tuple[str, str, bool], ...]:
+    """(name, description, is_hr) per dropdown entry, built once per user-coating signature."""
+    lib = _get_cached_service().get_library()
+    return tuple((c["name"], c.get("description", ""), c.get("is_hr", False)) for c in lib)
+
+
 def get_all_coatings() -> List[Dict[str, Any]]:
     """Return coating library for dropdown (built-in + user)."""
-    user = get_all_user_coatings()
-    svc = get_coating_service(user)
-    lib = svc.get_library()
+    _get_cached_service()
     return [
-        {"name": c["name"], "description": c.get("description", ""), "is_hr": c.get("is_hr", False)}
-        for c in lib
+        {"name": name, "description": description, "is_hr": is_hr}
+        for name, description, is_hr in _dropdown_cached(_svc_cache["sig"])
     ]
@@ -3,9 +3,19 @@ ABCD matrix method for Gaussian beam propagation through optical systems.
 Computes beam waist, Rayleigh range, and 1/e² envelope for visualization.
 """
 
+import math
+import os
+import sys
+from functools import lru_cache
 from typing import Optional
 import numpy as np
 
+_backend_dir = os.path.dirname(os.path.abspath(__file__))
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
+
+from jit_utils import njit
+
 
 def _abcd_propagate(q_in: complex, a: float, b: float, c: float, d: float) -> complex:
     """Propagate complex beam parameter: q_out = (A*q_in + B) / (C*q_in + D)"""
@@ -15,6 +25,38 @@ def _abcd_propagate(q_in: complex, a: float, b: float, c: float, d: float) -> co
     return (a * q_in + b) / denom
 
 
+@njit(cache=True)
+def _propagate_chain(c_refract, d_refract, thick, q_r, q_i):
+    """
+    ABCD chain through all surfaces on (Re q, Im q) float pairs: refract at each
+    surface (A=1, B=0, C, D), record q, then add the thickness. Stops at the first
+    blow-up, leaving later recorded entries at inf.
+    Returns (q_surf_re, q_surf_im, q_r, q_i, z) with z the distance propagated.
+    """
+    n_surf = len(thick)
+    q_surf_re = np.full(n_surf, np.inf)
+    q_surf_im = np.zeros(n_surf)
+    z = 0.0
+    for i in range(n_surf):
+        # q = q / (C*q + D)
+        den_r = c_refract[i] * q_r + d_refract[i]
+        den_i = c_refract[i] * q_i
+        den_sq = den_r * den_r + den_i * den_i
+        if math.sqrt(den_sq) < 1e-20:
+            q_r, q_i = np.inf, 0.0
+            break
+        new_r = (q_r * den_r + q_i * den_i) / den_sq
+        new_i = (q_i * den_r - q_r * den_i) / den_sq
+        q_r, q_i = new_r, new_i
+        if math.isinf(q_r) or math.isinf(q_i):
+            break
+        q_surf_re[i] = q_r
+        q_surf_im[i] = q_i
+        q_r += thick[i]
+        z += thick[i]
+    return q_surf_re, q_surf_im, q_r, q_i, z
+
+
 def _q_to_waist_rayleigh(q: complex, wvl_mm: float) -> tuple[float, float]:
     """
     At beam waist: q = j*z_R (pure imaginary), so z_R = Im(q), w0² = λ*z_R/π.
@@ -25,22 +67,24 @@ def _q_to_waist_rayleigh(q: complex, wvl_mm: float) -> tuple[float, float]:
     z_r = q.imag
     if z_r <= 0:
         return 0.0, 0.0
-    w0_sq = wvl_mm * z_r / np.pi
-    w0 = float(np.sqrt(w0_sq))
+    w0_sq = wvl_mm * z_r / math.pi
+    w0 = math.sqrt(w0_sq)
     return w0, float(z_r)
 
 
-def _beam_radius_from_q(q: complex, wvl_mm: float) -> float:
-    """Beam radius w (1/e²) from q: w² = λ/π * |q|² / Im(q) for Im(q) > 0."""
-    if abs(q) < 1e-20 or q.imag <= 0:
-        return 0.0
-    denom = np.pi * q.imag
-    w_sq = wvl_mm * (q.real**2 + q.imag**2) / denom
-    return float(np.sqrt(max(0, w_sq)))
+def _beam_radii_from_q(q: np.ndarray, wvl_mm: float) -> np.ndarray:
+    """Beam radius w (1/e²) for each q in an array: w² = λ/π * |q|² / Im(q); 0 where Im(q) <= 0."""
+    q = np.asarray(q, dtype=np.complex128)
+    q_re, q_im = q.real, q.imag
+    ok = (np.abs(q) >= 1e-20) & (q_im > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w_sq = wvl_mm * (q_re**2 + q_im**2) / (np.pi * q_im)
+    return np.where(ok, np.sqrt(np.maximum(0.0, np.where(ok, w_sq, 0.0))), 0.0)
 
 
-def _beam_radius_at_z(w0: float, z_r: float, z_from_waist: float) -> float:
-    """1/e² beam radius at distance z from waist: w(z) = w0 * sqrt(1 + (z/z_R)²)"""
+def _beam_radii_at_z(w0: float, z_r: float, z_from_waist: np.ndarray) -> np.ndarray:
+    """1/e² beam radius at each distance z from the waist: w(z) = w0 * sqrt(1 + (z/z_R)²)"""
+    z_from_waist = np.asarray(z_from_waist, dtype=np.float64)
     return w0 * np.sqrt(1.0 + (z_from_waist / z_r) ** 2)
 
 
@@ -66,50 +110,65 @@ def compute_gaussian_beam(
         rayleighRange: z_R at focus (mm)
         waistZ: axial position of beam waist (mm)
         focusZ: paraxial focus position (mm)
+
+    Results are memoized on the (hashable) inputs; beamEnvelope is shared between calls.
     """
+    surf_key = tuple(tuple(float(x) for x in row) for row in surf_data_list)
+    focus_key = None if focus_z_override is None else float(focus_z_override)
+    return dict(_compute_cached(surf_key, float(epd_mm), float(wvl_nm), float(m2), int(n_samples), focus_key))
+
+
+@lru_cache(maxsize=64)
+def _compute_cached(
+    surf_tuple: tuple, epd_mm: float, wvl_nm: float, m2: float, n_samples: int, focus_z: Optional[float]
+) -> dict:
+    """compute_gaussian_beam keyed on a tuple of surf_data rows."""
+    return _compute_gaussian_beam_impl(surf_tuple, epd_mm, wvl_nm, m2, n_samples, focus_z)
+
+
+def _compute_gaussian_beam_impl(
+    surf_data_list,
+    epd_mm: float,
+    wvl_nm: float,
+    m2: float,
+    n_samples: int,
+    focus_z_override: Optional[float],
+) -> dict:
+    """Uncached compute_gaussian_beam (see there for arguments and result keys)."""
     wvl_mm = wvl_nm * 1e-6
     w0_entrance = (epd_mm / 2.0) * 0.9  # effective waist at entrance (slightly smaller)
     z_r_entrance = np.pi * (w0_entrance ** 2) / (wvl_mm * m2)  # M²: z_R ∝ 1/M²
     q = 1j * z_r_entrance  # at waist, R=∞
 
-    z_positions = [0.0]
-    n_list = [1.0]
+    # Per-surface arrays: curvature, thickness, index after each surface
+    surf = np.asarray(surf_data_list, dtype=np.float64)
+    surf = surf.reshape(-1, surf.shape[-1] if surf.size else 4)
+    curv, thick, n_after = surf[:, 0], surf[:, 1], surf[:, 2]
+    n_before = np.concatenate(([1.0], n_after[:-1]))
 
-    for row in surf_data_list:
-        curv, thick, n = float(row[0]), float(row[1]), float(row[2])
-        n_list.append(n)
+    # Refraction at curved interface: C = (n_before - n_after) / (R * n_after), D = n_before / n_after
+    # R = 1/curv (curvature in 1/mm); flat surfaces use R = 1e6 to avoid div by zero
+    safe_curv = np.where(np.abs(curv) > 1e-12, curv, 1.0)
+    r_mm = np.where(np.abs(curv) > 1e-12, 1.0 / safe_curv, 1e6)
+    c_refract = (n_before - n_after) / (r_mm * n_after)
+    d_refract = n_before / n_after
 
     # Build ABCD chain: object -> surf1 -> propagate -> surf2 -> propagate -> ...
-    z_current = 0.0
-    for i, row in enumerate(surf_data_list):
-        curv, thick, n = float(row[0]), float(row[1]), float(row[2])
-        n_before = n_list[i]
-        n_after = n
-
-        # Refraction at curved interface: C = (n_before - n_after) / (R * n_after), D = n_before / n_after
-        # R = 1/curv (curvature in 1/mm)
-        r_mm = 1.0 / curv if abs(curv) > 1e-12 else 1e6  # avoid div by zero for flat
-        c_refract = (n_before - n_after) / (r_mm * n_after)
-        d_refract = n_before / n_after
-        a_refract, b_refract = 1.0, 0.0
-
-        q = _abcd_propagate(q, a_refract, b_refract, c_refract, d_refract)
-        if np.isinf(q):
-            break
-
-        # Propagate through thickness
-        a_prop, b_prop = 1.0, thick
-        c_prop, d_prop = 0.0, 1.0
-        q = _abcd_propagate(q, a_prop, b_prop, c_prop, d_prop)
-        z_current += thick
-
-        z_positions.append(z_current)
+    # Sequential dependency on q, so this is a scalar loop over surfaces (JIT-compiled
+    # when numba is available). q just after each refraction is kept for the envelope pass.
+    q_surf_re, q_surf_im, q_r, q_i, z_current = _propagate_chain(
+        np.ascontiguousarray(c_refract), np.ascontiguousarray(d_refract),
+        np.ascontiguousarray(thick), float(q.real), float(q.imag),
+    )
+    q = complex(q_r, q_i)
+    q_surf = q_surf_re + 1j * q_surf_im
+    z_current = float(z_current)
 
     # Find waist position and paraxial focus
     if focus_z_override is not None and np.isfinite(focus_z_override):
         focus_z = float(focus_z_override)
     else:
-        efl = _paraxial_efl(surf_data_list)
+        efl = _paraxial_efl(surf)
         if efl and np.isfinite(efl) and efl > 0:
             focus_z = z_current + efl
         else:
@@ -127,47 +186,46 @@ def compute_gaussian_beam(
 
     waist_z = focus_z
 
-    # Build beam envelope: propagate q through system and sample w at each z
-    envelope = []
+    # Build beam envelope: propagate q through system and sample w at each z.
+    # Sample counts are known upfront, so fill preallocated z/w arrays slice by slice;
+    # free-space sections outside the system are closed-form w(z) over a linspace.
     z_min = -50.0
+    n_pre = max(5, n_samples // 10)
+    n_steps = np.maximum(3, (thick / 2).astype(int))
+    n_mid = int(np.sum(n_steps + 1))
+    n_post = n_samples
+    zs = np.empty(n_pre + n_mid + n_post, dtype=np.float64)
+    ws = np.empty_like(zs)
 
     # Pre-focus: collimated expansion
-    for z in np.linspace(z_min, 0, max(5, n_samples // 10)):
-        w = _beam_radius_at_z(w0_entrance, z_r_entrance, -float(z))
-        envelope.append([float(z), float(w)])
-
-    # Through system: step-by-step propagation
-    q_trace = 1j * z_r_entrance
-    z_trace = 0.0
-    n_list = [1.0] + [float(r[2]) for r in surf_data_list]
-
-    for i, row in enumerate(surf_data_list):
-        curv, thick, n = float(row[0]), float(row[1]), float(row[2])
-        n_before, n_after = n_list[i], n_list[i + 1]
-        r_mm = 1.0 / curv if abs(curv) > 1e-12 else 1e6
-        c_r = (n_before - n_after) / (r_mm * n_after)
-        q_trace = _abcd_propagate(q_trace, 1, 0, c_r, n_before / n_after)
-        w_at_surf = _beam_radius_from_q(q_trace, wvl_mm)
-        envelope.append([z_trace, w_at_surf])
-
-        n_steps = max(3, int(thick / 2))
-        for k in range(1, n_steps + 1):
-            dz = thick * k / n_steps
-            q_prop = _abcd_propagate(q_trace, 1, dz, 0, 1)
-            w = _beam_radius_from_q(q_prop, wvl_mm)
-            envelope.append([z_trace + dz, w])
-
-        q_trace = _abcd_propagate(q_trace, 1, thick, 0, 1)
-        z_trace += thick
+    zs_pre = np.linspace(z_min, 0.0, n_pre)
+    zs[:n_pre] = zs_pre
+    ws[:n_pre] = _beam_radii_at_z(w0_entrance, z_r_entrance, -zs_pre)
+    pos = n_pre
+
+    # Through system: every sub-step of every thickness in one array. Free-space
+    # propagation from the q recorded after surface i is q + dz, with dz over
+    # linspace(0, thick[i], n_steps[i] + 1).
+    z_surf = np.concatenate(([0.0], np.cumsum(thick)))
+    counts = n_steps + 1
+    seg = np.repeat(np.arange(len(surf)), counts)
+    k = np.arange(n_mid) - np.repeat(np.cumsum(counts) - counts, counts)
+    dz = k * (thick / n_steps)[seg]
+    dz[np.cumsum(counts) - 1] = thick  # exact endpoints, as linspace gives
+    zs[pos:pos + n_mid] = z_surf[seg] + dz
+    ws[pos:pos + n_mid] = _beam_radii_from_q(q_surf[seg] + dz, wvl_mm)
+    pos += n_mid
+    z_trace = float(z_surf[-1])
 
     # Post-system to focus and beyond
     z_max = focus_z + 2 * z_r_focus
-    for z in np.linspace(z_trace, z_max, n_samples):
-        z_from_waist = z - waist_z
-        w = _beam_radius_at_z(w0_focus, z_r_focus, z_from_waist)
-        envelope.append([float(z), float(w)])
+    zs_post = np.linspace(z_trace, z_max, n_post)
+    zs[pos:] = zs_post
+    ws[pos:] = _beam_radii_at_z(w0_focus, z_r_focus, zs_post - waist_z)
 
-    envelope.sort(key=lambda p: p[0])
+    # Stable sort keeps the original ordering of equal-z samples (e.g. at surfaces)
+    order = np.argsort(zs, kind="stable")
+    envelope = np.column_stack((zs[order], ws[order])).tolist()
 
     return {
         "beamEnvelope": envelope,
@@ -182,9 +240,16 @@ def _paraxial_efl(surf_data_list: list) -> Optional[float]:
     """Approximate EFL using lensmaker's formula for thin lens."""
     if len(surf_data_list) < 2:
         return None
-    r1 = 1.0 / surf_data_list[0][0] if abs(surf_data_list[0][0]) > 1e-12 else 1e6
-    r2 = 1.0 / surf_data_list[1][0] if abs(surf_data_list[1][0]) > 1e-12 else 1e6
-    n = surf_data_list[0][2]
+    return _paraxial_efl_cached(
+        float(surf_data_list[0][0]), float(surf_data_list[1][0]), float(surf_data_list[0][2])
+    )
+
+
+@lru_cache(maxsize=256)
+def _paraxial_efl_cached(c0: float, c1: float, n: float) -> Optional[float]:
+    """Thin-lens EFL from the first two curvatures and the first index (the only inputs used)."""
+    r1 = 1.0 / c0 if abs(c0) > 1e-12 else 1e6
+    r2 = 1.0 / c1 if abs(c1) > 1e-12 else 1e6
     if abs(r1) < 1e-6 or abs(r2) < 1e-6:
         return None
     phi = (n - 1) * (1 / r1 - 1 / r2)
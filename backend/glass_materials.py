@@ -5,7 +5,10 @@ Loads from glass_library.json; used by trace_service for wavelength-dependent re
 
 import json
 import os
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
 
 _backend_dir = os.path.dirname(os.path.abspath(__file__))
 _LIBRARY_PATH = os.path.join(_backend_dir, "glass_library.json")
@@ -13,6 +16,17 @@ _LIBRARY_PATH = os.path.join(_backend_dir, "glass_library.json")
 # Cache loaded materials
 _materials_cache: Optional[List[Dict[str, Any]]] = None
 _name_to_material: Optional[Dict[str, Dict[str, Any]]] = None
+_sellmeier_table: Optional[Tuple[List[str], np.ndarray, np.ndarray]] = None
+
+
+def reload_library() -> None:
+    """Drop the loaded library and every lookup derived from it (next access re-reads the JSON)."""
+    global _materials_cache, _name_to_material, _sellmeier_table
+    _materials_cache = None
+    _name_to_material = None
+    _sellmeier_table = None
+    _index_cached.cache_clear()
+    _material_cached.cache_clear()
 
 
 def _load_library() -> List[Dict[str, Any]]:
@@ -75,6 +89,44 @@ def n_from_sellmeier(lambda_nm: float, coeffs: Dict[str, List[float]]) -> float:
     return (max(n2, 1.0)) ** 0.5
 
 
+def _load_sellmeier_table() -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Sellmeier materials as stacked coefficient arrays: (names, B (K, 3), C (K, 3)).
+    Missing terms are padded with B = C = 0 so they contribute nothing.
+    """
+    global _sellmeier_table
+    if _sellmeier_table is not None:
+        return _sellmeier_table
+    names: List[str] = []
+    rows_b: List[List[float]] = []
+    rows_c: List[List[float]] = []
+    for m in _load_library():
+        coeffs = m.get("coefficients", {})
+        if not m.get("name") or m.get("dispersion_formula") != "sellmeier" or not coeffs:
+            continue
+        B = coeffs.get("B", [0, 0, 0])
+        C = coeffs.get("C", [1, 1, 1])
+        k = min(3, len(B), len(C))
+        names.append(m["name"])
+        rows_b.append([float(b) for b in B[:k]] + [0.0] * (3 - k))
+        rows_c.append([float(c) for c in C[:k]] + [0.0] * (3 - k))
+    _sellmeier_table = (
+        names,
+        np.array(rows_b, dtype=np.float64).reshape(-1, 3),
+        np.array(rows_c, dtype=np.float64).reshape(-1, 3),
+    )
+    return _sellmeier_table
+
+
+def n_from_sellmeier_array(lambda_nm: float, B: np.ndarray, C: np.ndarray) -> np.ndarray:
+    """Vectorized n_from_sellmeier: one index per row of (K, 3) B/C coefficient arrays."""
+    lam_um = lambda_nm * 1e-3
+    lam2 = lam_um * lam_um
+    terms = (B * lam2) / (lam2 - C)
+    n2 = 1.0 + terms[:, 0] + terms[:, 1] + terms[:, 2]
+    return np.maximum(n2, 1.0) ** 0.5
+
+
 def refractive_index_at_wavelength(
     lambda_nm: float,
     material_name: Optional[str],
@@ -88,8 +140,13 @@ def refractive_index_at_wavelength(
         return refractive_index_fallback
     if refractive_index_fallback <= 1.001:
         return 1.0  # Air
-    index = _build_name_index()
-    mat = index.get(material_name.lower().strip())
+    return _index_cached(float(lambda_nm), material_name.lower().strip(), refractive_index_fallback)
+
+
+@lru_cache(maxsize=2048)
+def _index_cached(lambda_nm: float, key: str, refractive_index_fallback: float) -> float:
+    """n(λ) for a normalized (lower-cased, stripped) material name; cleared by reload_library."""
+    mat = _build_name_index().get(key)
     if mat is None:
         return refractive_index_fallback
     formula = mat.get("dispersion_formula", "constant")
@@ -108,5 +165,10 @@ def get_all_materials() -> List[Dict[str, Any]]:
 
 def get_material_by_name(name: str) -> Optional[Dict[str, Any]]:
     """Look up material by name (case-insensitive)."""
-    index = _build_name_index()
-    return index.get(name.lower().strip())
+    return _material_cached(name.lower().strip())
+
+
+@lru_cache(maxsize=512)
+def _material_cached(key: str) -> Optional[Dict[str, Any]]:
+    """Material entry for a normalized name; cleared by reload_library."""
+    return _build_name_index().get(key)
@@ -0,0 +1,36 @@
+"""
+Optional Numba JIT support for numerical kernels.
+If numba is installed, njit compiles to native code; otherwise it is a
+no-op stand-in and the kernels run as plain Python/NumPy.
+"""
+
+try:
+    from numba import njit as _numba_njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op replacement for numba.njit; supports @njit and @njit(...)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(fn):
+            return fn
+        return decorator
+else:
+    def njit(*args, **kwargs):
+        """
+        numba.njit, except cache=True only applies to the flat module names the app imports
+        (e.g. gaussian_beam). The on-disk cache is per source file and records the module name;
+        entries written under backend.gaussian_beam (tests) cannot be loaded by the app.
+        """
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return _numba_njit(args[0])
+
+        def decorator(fn):
+            options = dict(kwargs)
+            if options.get("cache") and "." in fn.__module__:
+                options["cache"] = False
+            return _numba_njit(*args, **options)(fn)
+        return decorator
+
+
+__all__ = ["njit"]
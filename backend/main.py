@@ -5,6 +5,8 @@ Accepts optical_stack JSON, runs rayoptics trace, returns (z,y) coords for rays
 
 import sys
 import os
+import json
+from functools import lru_cache
 
 # NumPy 2.0 fix for rayoptics
 import numpy as np
@@ -15,15 +17,31 @@ from typing import Optional, List, Dict, Any
 
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import after path/numpy setup - backend dir must be on path
 _root = os.path.dirname(os.path.abspath(__file__))
 if _root not in sys.path:
     sys.path.insert(0, _root)
 from trace_service import run_trace, run_chromatic_shift
 
-app = FastAPI(title="Optics Trace API", version="0.1.0")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when installed (NumPy arrays native, NaN -> null); stdlib json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(title="Optics Trace API", version="0.1.0", default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -128,6 +146,7 @@ def create_custom_coating(req: UserCoatingCreate):
     Save a new user-defined coating. data_type: 'constant' (single R value) or 'table' (wavelength/reflectivity pairs).
     """
     from coating_db import insert_user_coating
+    from coatings import invalidate_coating_cache
     if req.data_type not in ("constant", "table"):
         raise HTTPException(status_code=400, detail="data_type must be 'constant' or 'table'")
     if req.data_type == "constant":
@@ -162,6 +181,8 @@ def create_custom_coating(req: UserCoatingCreate):
             description=req.description,
             is_hr=req.is_hr,
         )
+    invalidate_coating_cache()
+    _trace_body_cached.cache_clear()  # traces depend on coating reflectivity
     return created
 
 
@@ -243,14 +264,22 @@ class OpticalStackRequest(BaseModel):
     iterations: Optional[int] = None  # Monte Carlo iterations (default 100)
 
 
+@lru_cache(maxsize=128)
+def _trace_body_cached(stack_json: str) -> bytes:
+    """Rendered /api/trace body for a serialized OpticalStackRequest; identical stacks skip the trace."""
+    # Render once here: the payload is already plain JSON types, so skip jsonable_encoder
+    return FastJSONResponse(run_trace(json.loads(stack_json))).body
+
+
 @app.post("/api/trace")
 def trace_rays(req: OpticalStackRequest):
     """
     Run ray trace on optical_stack.
     Returns rays as list of [[z,y], ...] polylines, surface curves, focusZ, performance.
+    Responses are cached by the request's JSON (frontend re-renders resend the same stack).
     """
-    optical_stack = req.model_dump()
-    return run_trace(optical_stack)
+    body = _trace_body_cached(req.model_dump_json())
+    return Response(content=body, media_type="application/json")
 
 
 class ChromaticShiftRequest(OpticalStackRequest):
@@ -300,7 +329,7 @@ def monte_carlo(req: OpticalStackRequest):
     from monte_carlo_service import run_monte_carlo
     optical_stack = req.model_dump()
     iterations = optical_stack.pop("iterations", None) or 100
-    return run_monte_carlo(optical_stack, iterations=iterations)
+    return FastJSONResponse(run_monte_carlo(optical_stack, iterations=iterations))
 
 
 class LensXExportRequest(BaseModel):
@@ -333,7 +362,7 @@ def export_lens_x(req: LensXExportRequest):
 @app.post("/api/import/lens-system")
 async def import_lens_system(file: UploadFile = File(...)):
     """
-    Import lens system from .json (Zemax-style) or .svg file.
+    Import lens system from .json (Zemax-style), Zemax .zmx or .svg file.
     Returns { surfaces: Surface[] } ready for the frontend.
     """
     from optical_importer import import_lens_system as do_import
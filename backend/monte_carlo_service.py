@@ -5,7 +5,12 @@ within tolerance, return spot positions at image plane for point cloud visualiza
 
 import sys
 import os
-import random
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+
 import numpy as np
 
 _backend_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,47 +19,50 @@ if _backend_dir not in sys.path:
 
 from trace_service import optical_stack_to_surf_data
 from singlet_rayoptics import build_singlet_from_surface_data, get_focal_length, run_spot_diagram
+from jit_utils import njit
+
+logger = logging.getLogger(__name__)
+
+# Process pool only pays off when each worker gets enough iterations to
+# amortize its start-up (importing rayoptics, building the model).
+_MIN_ITERATIONS_PER_WORKER = 200
 
 
-def _jitter_surfaces(surfaces, rng=None, only_surface_idx=None):
+@njit(cache=True, fastmath=True)
+def _build_jittered(radius, thickness, n_idx, v_num, r_tol, t_tol, u):
     """
-    Create a copy of surfaces with radius and thickness jittered within their tolerances.
-    Uses uniform distribution in [-tolerance, +tolerance].
-    If only_surface_idx is set, jitter only that surface (for sensitivity analysis).
+    Jittered surface data for all iterations at once.
+    u: (iterations, n_surf, 2) uniform draws in [-1, 1] for (radius, thickness).
+    Returns (iterations, n_surf, 4) array of [curvature, thickness, n, v].
     """
-    rng = rng or random.Random()
-    jittered = []
-    for i, s in enumerate(surfaces):
-        surf = dict(s)
-        if only_surface_idx is not None and i != only_surface_idx:
-            jittered.append(surf)
-            continue
-        r_tol = float(s.get("radiusTolerance") or 0)
-        t_tol = float(s.get("thicknessTolerance") or 0)
-        if r_tol > 0:
-            surf["radius"] = float(s["radius"]) + rng.uniform(-r_tol, r_tol)
-        if t_tol > 0:
-            surf["thickness"] = float(s["thickness"]) + rng.uniform(-t_tol, t_tol)
-            surf["thickness"] = max(0.01, surf["thickness"])
-        jittered.append(surf)
-    return jittered
-
-
-def _run_single_monte_carlo(optical_stack, surfaces_list, rng, num_rays, epd, wvl_nm, field_angles):
-    """Run one Monte Carlo iteration and return spots + focus_z. Returns (spots, focus_z) or (None, 0)."""
-    surf_data_list = optical_stack_to_surf_data(surfaces_list, wvl_nm=wvl_nm)
-    surface_diameters = [float(s.get("diameter", 25) or 25) for s in surfaces_list]
-    try:
-        opt_model = build_singlet_from_surface_data(
-            surf_data_list,
-            wvl_nm=wvl_nm,
-            radius_mode=False,
-            object_distance=1e10,
-            epd=epd,
-            surface_diameters=surface_diameters,
-        )
-    except Exception:
-        return None, 0.0
+    n_iter = u.shape[0]
+    n_surf = u.shape[1]
+    out = np.empty((n_iter, n_surf, 4))
+    for i in range(n_iter):
+        for j in range(n_surf):
+            r = radius[j]
+            if r_tol[j] > 0:
+                r = r + u[i, j, 0] * r_tol[j]
+            t = thickness[j]
+            if t_tol[j] > 0:
+                t = max(0.01, t + u[i, j, 1] * t_tol[j])
+            out[i, j, 0] = 1.0 / r if r != 0 else 0.0
+            out[i, j, 1] = t
+            out[i, j, 2] = n_idx[j]
+            out[i, j, 3] = v_num[j]
+    return out
+
+
+def _build_mc_model(surf_data_list, surface_diameters, epd, wvl_nm, field_angles):
+    """Build the optical model once from nominal surface data and configure the field of view."""
+    opt_model = build_singlet_from_surface_data(
+        surf_data_list,
+        wvl_nm=wvl_nm,
+        radius_mode=False,
+        object_distance=1e10,
+        epd=epd,
+        surface_diameters=surface_diameters,
+    )
     if field_angles:
         osp = opt_model.optical_spec
         fov = osp.field_of_view
@@ -62,25 +70,68 @@ def _run_single_monte_carlo(optical_stack, surfaces_list, rng, num_rays, epd, wv
         if fov.value == 0:
             fov.value = 1.0
         opt_model.update_model()
-        opt_model.optical_spec.update_optical_properties()
-    try:
-        spot_xy, dxdy = run_spot_diagram(
-            opt_model, num_rays=num_rays, fld=0, wvl=wvl_nm, foc=0.0
-        )
-    except Exception:
-        return None, 0.0
-    valid = ~np.isnan(dxdy[:, 0])
-    spots = [[float(spot_xy[idx, 0]), float(spot_xy[idx, 1])] for idx in range(len(spot_xy)) if valid[idx]]
-    sm = opt_model.seq_model
-    tfrms = sm.gbl_tfrms
+    return opt_model
+
+
+def _focus_z(opt_model):
+    """Paraxial focus Z (mm) relative to the first surface."""
+    tfrms = opt_model.seq_model.gbl_tfrms
     z_origin = tfrms[1][1][2] if len(tfrms) > 1 else 0
     efl, fod = get_focal_length(opt_model)
     bfl = fod.bfl if (fod and fod.efl != 0) else 50.0
     if not np.isfinite(bfl):
         bfl = 50.0
     last_surf_z = tfrms[-2][1][2] if len(tfrms) >= 2 else tfrms[-1][1][2]
-    focus_z = last_surf_z + bfl - z_origin
-    return spots, focus_z
+    return last_surf_z + bfl - z_origin
+
+
+def _retrace(opt_model, jittered, num_rays, wvl_nm):
+    """
+    Overwrite curvature/thickness of an existing model in place and re-run the spot diagram.
+    jittered: (n_surf, 4) rows of [curvature, thickness, n, v]; n and v never change.
+    Returns (N, 2) array of valid spot (x, y), or None if the trace failed.
+    """
+    sm = opt_model.seq_model
+    try:
+        for j in range(len(jittered)):
+            sm.ifcs[j + 1].profile.cv = float(jittered[j, 0])
+            sm.gaps[j + 1].thi = float(jittered[j, 1])
+        opt_model.update_model()  # also refreshes paraxial optical properties
+        spot_xy, dxdy = run_spot_diagram(
+            opt_model, num_rays=num_rays, fld=0, wvl=wvl_nm, foc=0.0
+        )
+    except Exception:
+        return None
+    valid = ~np.isnan(dxdy[:, 0])
+    return np.asarray(spot_xy, dtype=np.float64)[valid]
+
+
+def _run_iterations(opt_model, jittered, num_rays, wvl_nm):
+    """Retrace each (n_surf, 4) slice of jittered. Returns ((N, 2) valid spots, failed count)."""
+    spots = []
+    n_failed = 0
+    for k in range(len(jittered)):
+        s = _retrace(opt_model, jittered[k], num_rays, wvl_nm)
+        if s is None:
+            n_failed += 1
+            continue
+        spots.append(s)
+    return (np.concatenate(spots, axis=0) if spots else np.empty((0, 2))), n_failed
+
+
+def _mc_chunk(jittered, surf_data_list, surface_diameters, epd, wvl_nm, num_rays, field_angles):
+    """Process-pool worker: build a model from nominal surf_data and run a block of iterations."""
+    try:
+        opt_model = _build_mc_model(surf_data_list, surface_diameters, epd, wvl_nm, field_angles)
+    except Exception:
+        return np.empty((0, 2)), len(jittered)
+    return _run_iterations(opt_model, jittered, num_rays, wvl_nm)
+
+
+def _rms_spread(spots):
+    """RMS radius of an (N, 2) point cloud about its centroid."""
+    centroid = spots.mean(axis=0)
+    return float(np.sqrt(((spots - centroid) ** 2).sum(axis=1).mean()))
 
 
 def run_monte_carlo(optical_stack: dict, iterations: int = 100) -> dict:
@@ -89,8 +140,9 @@ def run_monte_carlo(optical_stack: dict, iterations: int = 100) -> dict:
 
     For each iteration:
       - Jitter radius and thickness for each surface within their tolerances
-      - Build optical model and run spot diagram
+      - Update the optical model (built once) in place and run spot diagram
       - Collect spot (x,y) positions at image plane for all rays
+    Large runs are split into chunks across a process pool (one model per worker).
 
     Returns:
         spots: list of [x, y] in mm at image plane (one per ray per iteration)
@@ -104,30 +156,58 @@ def run_monte_carlo(optical_stack: dict, iterations: int = 100) -> dict:
     if not surfaces:
         return {"error": "No surfaces", "spots": [], "focusZ": 0, "imagePlaneZ": 0, "rmsSpread": 0, "numValid": 0}
 
+    iterations = max(0, int(iterations))
     num_rays = int(optical_stack.get("numRays", 9) or 9)
     epd = float(optical_stack.get("entrancePupilDiameter", 10) or 10)
     wvl_nm = float(optical_stack.get("wavelengths", [587.6])[0] or 587.6)
-    rng = random.Random(42)
-
-    all_spots = []
-    focus_z = 0.0
-    z_origin = 0.0
-    last_error = None
-
+    rng = np.random.default_rng(42)
+    surface_diameters = [float(s.get("diameter", 25) or 25) for s in surfaces]
+
+    # Extract per-surface arrays once; n and v do not depend on the jittered
+    # radius/thickness, so take them from the nominal surface data.
+    nominal = optical_stack_to_surf_data(surfaces, wvl_nm=wvl_nm)
+    n_idx = np.array([1.0 if row[2] == "REFL" else float(row[2]) for row in nominal])
+    v_num = np.array([float(row[3]) for row in nominal])
+    radius = np.array([float(s.get("radius", 0) or 0) for s in surfaces])
+    thickness = np.array([float(s.get("thickness", 0) or 0) for s in surfaces])
+    r_tol = np.array([float(s.get("radiusTolerance") or 0) for s in surfaces])
+    t_tol = np.array([float(s.get("thicknessTolerance") or 0) for s in surfaces])
+    u = rng.uniform(-1.0, 1.0, size=(iterations, len(surfaces), 2))
+    jittered = _build_jittered(radius, thickness, n_idx, v_num, r_tol, t_tol, u)
+
+    # Build the model once; each iteration only rewrites curvatures/thicknesses.
     field_angles = optical_stack.get("fieldAngles", [0])
-    for i in range(iterations):
-        jittered_surfaces = _jitter_surfaces(surfaces, rng)
-        spots, foc_z = _run_single_monte_carlo(
-            optical_stack, jittered_surfaces, rng, num_rays, epd, wvl_nm, field_angles
-        )
-        if spots is None:
-            last_error = "Trace failed"
-            continue
-        all_spots.extend(spots)
-        if i == 0:
-            focus_z = foc_z
-
-    if not all_spots:
+    try:
+        opt_model = _build_mc_model(nominal, surface_diameters, epd, wvl_nm, field_angles)
+    except Exception:
+        return {"error": "Trace failed", "spots": [], "focusZ": 0.0, "imagePlaneZ": 0.0, "rmsSpread": 0.0, "numValid": 0}
+    focus_z = _focus_z(opt_model)
+
+    # Iterations are independent: split into chunks across processes when large enough
+    n_workers = min(os.cpu_count() or 1, iterations // _MIN_ITERATIONS_PER_WORKER)
+    results = None
+    if n_workers > 1:
+        chunks = np.array_split(jittered, n_workers)
+        # forkserver: forking a threaded server process (FastAPI workers) can deadlock.
+        # It is not available on Windows, where spawn is the safe equivalent.
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        try:
+            ctx = multiprocessing.get_context(method)
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as ex:
+                results = list(ex.map(
+                    _mc_chunk, chunks, repeat(nominal), repeat(surface_diameters),
+                    repeat(epd), repeat(wvl_nm), repeat(num_rays), repeat(field_angles),
+                ))
+        except (OSError, ValueError, BrokenProcessPool) as e:
+            # Process pool could not start or lost a worker; run the iterations serially
+            logger.warning("Monte Carlo process pool failed (%s); running %d iterations serially", e, iterations)
+            results = None
+    if results is None:
+        results = [_run_iterations(opt_model, jittered, num_rays, wvl_nm)]
+
+    spots_arr = np.concatenate([r[0] for r in results], axis=0)
+    last_error = "Trace failed" if any(r[1] for r in results) else None
+    if len(spots_arr) == 0:
         return {
             "error": last_error or "No valid traces",
             "spots": [],
@@ -137,39 +217,39 @@ def run_monte_carlo(optical_stack: dict, iterations: int = 100) -> dict:
             "numValid": 0,
         }
 
-    spots_arr = np.array(all_spots)
-    cx = float(np.mean(spots_arr[:, 0]))
-    cy = float(np.mean(spots_arr[:, 1]))
-    rms_spread = float(np.sqrt(np.mean((spots_arr[:, 0] - cx) ** 2 + (spots_arr[:, 1] - cy) ** 2)))
+    rms_spread = _rms_spread(spots_arr)
 
     # Per-surface sensitivity: jitter one surface at a time, measure RMS spread
+    # All draws come from one bulk rng call, one (radius, thickness) pair per surface and
+    # iteration; each run scatters its surface's draws into an otherwise-zero buffer and
+    # masks the other tolerances to 0.
     sensitivity_iterations = 20
     sensitivity_by_surface = [0.0] * len(surfaces)
+    u_sens = rng.uniform(-1.0, 1.0, size=(len(surfaces), sensitivity_iterations, 2))
+    u_single = np.zeros((sensitivity_iterations, len(surfaces), 2))
     for surf_idx in range(len(surfaces)):
-        s = surfaces[surf_idx]
-        if (float(s.get("radiusTolerance") or 0) <= 0 and float(s.get("thicknessTolerance") or 0) <= 0:
+        if r_tol[surf_idx] <= 0 and t_tol[surf_idx] <= 0:
             continue
+        only = np.zeros(len(surfaces))
+        only[surf_idx] = 1.0
+        u_single[:, surf_idx] = u_sens[surf_idx]
+        jittered_single = _build_jittered(
+            radius, thickness, n_idx, v_num, r_tol * only, t_tol * only, u_single
+        )
+        u_single[:, surf_idx] = 0.0
         surf_spots = []
-        for _ in range(sensitivity_iterations):
-            jittered = _jitter_surfaces(surfaces, rng, only_surface_idx=surf_idx)
-            spots_single, _ = _run_single_monte_carlo(
-                optical_stack, jittered, rng, num_rays, epd, wvl_nm, field_angles
-            )
-            if spots_single:
-                surf_spots.extend(spots_single)
+        for k in range(sensitivity_iterations):
+            spots_single = _retrace(opt_model, jittered_single[k], num_rays, wvl_nm)
+            if spots_single is not None and len(spots_single):
+                surf_spots.append(spots_single)
         if surf_spots:
-            arr = np.array(surf_spots)
-            scx = float(np.mean(arr[:, 0]))
-            scy = float(np.mean(arr[:, 1]))
-            sensitivity_by_surface[surf_idx] = float(
-                np.sqrt(np.mean((arr[:, 0] - scx) ** 2 + (arr[:, 1] - scy) ** 2))
-            )
+            sensitivity_by_surface[surf_idx] = _rms_spread(np.concatenate(surf_spots, axis=0))
 
     return {
-        "spots": [[float(p[0]), float(p[1])] for p in all_spots],
+        "spots": spots_arr.tolist(),
         "focusZ": focus_z,
         "imagePlaneZ": focus_z,
         "rmsSpread": rms_spread,
-        "numValid": len(all_spots),
+        "numValid": len(spots_arr),
         "sensitivityBySurface": sensitivity_by_surface,
     }
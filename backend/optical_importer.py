@@ -1,25 +1,52 @@
 """
-OpticalImporter: Import lens systems from JSON (Zemax-style) and SVG files.
+OpticalImporter: Import lens systems from JSON (Zemax-style), Zemax .zmx and SVG files.
 Maps imported data to the Surface model (Radius, Thickness, Material, Aperture).
 
 DEVELOPER NOTE: Before making changes to import logic, read LENS_X_SPEC.md
 in the project root. It is the ground truth for the Lens-X schema.
 """
 
+import copy
+import hashlib
 import json
 import logging
+import math
+import os
+import random
 import re
-import uuid
+import sys
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_backend_dir = os.path.dirname(os.path.abspath(__file__))
+if _backend_dir not in sys.path:
+    sys.path.insert(0, _backend_dir)
+
 from glass_materials import get_material_by_name, refractive_index_at_wavelength
 
+# Parameter values sampled on each segment for centroid/extent
+_SAMPLE_TS = (0, 0.5, 1)
+
 # Default wavelength for refractive index lookup
 _DEFAULT_WVL_NM = 587.6
 _DEFAULT_APERTURE_RADIUS = 12.5  # mm; diameter = 2 * aperture_radius
 
 logger = logging.getLogger(__name__)
 
+# Surface ids only need to be unique within the editor; one OS-seeded PRNG
+# avoids an os.urandom call per surface.
+_rng = random.Random(os.urandom(16))
+
+
+def _new_surface_id() -> str:
+    """Random 64-bit surface id as 16 hex characters."""
+    return f"{_rng.getrandbits(64):016x}"
+
 
 def _parse_radius(v: Any) -> float:
     """
@@ -38,6 +65,38 @@ def _parse_radius(v: Any) -> float:
         return 0.0
 
 
+# Accepted key spellings per surface field, in priority order
+_RADIUS_KEYS = ("Radius", "radius", "R")
+_CURVATURE_KEYS = ("Curvature", "curvature", "CURV")
+_THICKNESS_KEYS = ("Thickness", "thickness", "T", "spacing")
+_DIAMETER_KEYS = ("Diameter", "diameter", "DIAM", "aperture")
+_APERTURE_RADIUS_KEYS = ("aperture_radius", "ApertureRadius", "APERTURE_RADIUS")
+_MATERIAL_KEYS = ("Material", "material", "Glass", "GLASS")
+_TYPE_KEYS = ("Type", "type")
+_COMMENT_KEYS = ("Comment", "comment", "description")
+
+
+def _get_float(d: Dict[str, Any], keys: Tuple[str, ...], default: float = 0.0) -> float:
+    """First non-empty value among keys that parses as float; default otherwise."""
+    for k in keys:
+        v = d.get(k)
+        if v is not None and v != "":
+            try:
+                return float(v)
+            except (TypeError, ValueError):
+                pass
+    return default
+
+
+def _get_str(d: Dict[str, Any], keys: Tuple[str, ...], default: str = "") -> str:
+    """First non-empty value among keys, stripped; default otherwise."""
+    for k in keys:
+        v = d.get(k)
+        if v is not None and v != "":
+            return str(v).strip()
+    return default
+
+
 def _surface_from_dict(
     raw: Dict[str, Any],
     idx: int,
@@ -48,44 +107,28 @@ def _surface_from_dict(
     Diameter/diameter, Type/type, etc.
     Prioritizes LENS-X-style physics (sellmeier, coating) when present.
     """
-    def get_float(d: Dict, *keys: str, default: float = 0.0) -> float:
-        for k in keys:
-            v = d.get(k)
-            if v is not None and v != "":
-                try:
-                    return float(v)
-                except (TypeError, ValueError):
-                    pass
-        return default
-
-    def get_str(d: Dict, *keys: str, default: str = "") -> str:
-        for k in keys:
-            v = d.get(k)
-            if v is not None and v != "":
-                return str(v).strip()
-        return default
-
-    # Radius: accept number or string 'infinity'/'inf'/'flat' -> 0 (flat)
-    radius_raw = raw.get("Radius") or raw.get("radius") or raw.get("R")
-    if radius_raw is None:
-        curv = get_float(raw, "Curvature", "curvature", "CURV", default=0.0)
-        radius = 1.0 / curv if curv != 0 else 0.0
-    else:
-        radius = _parse_radius(radius_raw)
+    # Radius: accept number or string 'infinity'/'inf'/'flat' -> 0 (flat).
+    # First truthy spelling wins, else the last one looked up (same as chained `or`).
+    radius_raw = None
+    for k in _RADIUS_KEYS:
+        radius_raw = raw.get(k)
+        if radius_raw:
+            break
+    radius = _parse_radius(radius_raw) if radius_raw is not None else 0.0
     if radius == 0:
-        curv = get_float(raw, "Curvature", "curvature", "CURV", default=0.0)
+        curv = _get_float(raw, _CURVATURE_KEYS, default=0.0)
         if curv != 0:
             radius = 1.0 / curv
 
-    thickness = get_float(raw, "Thickness", "thickness", "T", "spacing", default=0.0)
+    thickness = _get_float(raw, _THICKNESS_KEYS, default=0.0)
     # Diameter: prefer explicit diameter/aperture; else 2 * aperture_radius (default 12.5)
-    diameter = get_float(raw, "Diameter", "diameter", "DIAM", "aperture", default=0.0)
+    diameter = _get_float(raw, _DIAMETER_KEYS, default=0.0)
     if diameter <= 0:
-        ar = get_float(raw, "aperture_radius", "ApertureRadius", "APERTURE_RADIUS", default=_DEFAULT_APERTURE_RADIUS)
-        diameter = 2 * ar
+        ar = _get_float(raw, _APERTURE_RADIUS_KEYS, default=_DEFAULT_APERTURE_RADIUS)
+        diameter = 2.0 * ar
     diameter = max(0.1, diameter)
-    material_raw = get_str(raw, "Material", "material", "Glass", "GLASS")
-    surf_type = get_str(raw, "Type", "type", default="Glass").lower()
+    material_raw = _get_str(raw, _MATERIAL_KEYS)
+    surf_type = _get_str(raw, _TYPE_KEYS, default="Glass").lower()
     if surf_type in ("air", "object", "image", "stop"):
         surf_type = "Air"
         material = "Air"
@@ -101,14 +144,14 @@ def _surface_from_dict(
         )
 
     result: Dict[str, Any] = {
-        "id": str(uuid.uuid4()),
+        "id": _new_surface_id(),
         "type": surf_type,
         "radius": radius,
         "thickness": thickness,
         "refractiveIndex": n,
-        "diameter": max(0.1, diameter),
+        "diameter": diameter,
         "material": material,
-        "description": get_str(raw, "Comment", "comment", "description") or f"Surface {idx + 1}",
+        "description": _get_str(raw, _COMMENT_KEYS) or f"Surface {idx + 1}",
     }
     # LENS-X-style physics: load sellmeier and coating directly when present
     physics = raw.get("physics")
@@ -220,7 +263,7 @@ def _surface_from_lens_x(raw: Dict[str, Any], idx: int) -> Dict[str, Any]:
 
     mfg = raw.get("manufacturing") or {}
     result: Dict[str, Any] = {
-        "id": str(uuid.uuid4()),
+        "id": _new_surface_id(),
         "type": surf_type,
         "radius": radius,
         "thickness": thickness,
@@ -258,13 +301,26 @@ def _parse_lens_x(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     return result
 
 
+def _loads_json(content: bytes) -> Any:
+    """
+    Parse JSON bytes, with orjson when installed. orjson rejects the NaN/Infinity
+    literals that stdlib json accepts, so documents it refuses are re-parsed with json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content.decode("utf-8"))
+
+
 def import_from_json(content: bytes) -> List[Dict[str, Any]]:
     """
     Parse JSON lens system. Prefers LENS-X format; falls back to Zemax-style/generic.
     LENS-X: maps physics.sellmeier into material engine.
     """
     try:
-        data = json.loads(content.decode("utf-8"))
+        data = _loads_json(content)
     except json.JSONDecodeError as e:
         logger.exception("JSON parse error: %s", e)
         raise ValueError(f"Invalid JSON: {e}") from e
@@ -289,6 +345,94 @@ def import_from_json(content: bytes) -> List[Dict[str, Any]]:
     return surfaces
 
 
+# Zemax .zmx records used for import: lens unit, surface index, curvature, thickness, glass,
+# semi-diameter. One pass over the raw bytes; the rest of each record line is captured.
+_ZMX_RE = re.compile(rb"^[ \t]*(UNIT|SURF|CURV|DISZ|GLAS|DIAM)[ \t]+([^\r\n]*)", re.M)
+
+# ZMX lens units (first UNIT argument) -> mm
+_ZMX_UNIT_MM = {"MM": 1.0, "CM": 10.0, "IN": 25.4, "METER": 1000.0}
+
+
+def import_from_zmx(content: bytes) -> List[Dict[str, Any]]:
+    """
+    Parse a Zemax .zmx lens file (SURF blocks with CURV/DISZ/GLAS/DIAM records).
+    The object (SURF 0) and image (last SURF) surfaces are dropped; DIAM is a semi-diameter.
+    CM, IN and METER lens units are scaled to mm. Glasses missing from the library (including model glasses) use the nd from their GLAS
+    record. Mirrors are rejected: folded (reflective) systems are not supported.
+    """
+    if content[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        # OpticStudio writes UTF-16 by default
+        try:
+            content = content.decode("utf-16").encode("utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Invalid ZMX file: {e}") from e
+
+    records: Dict[int, Dict[str, Any]] = {}
+    current: Optional[Dict[str, Any]] = None
+    scale = 1.0
+    for m in _ZMX_RE.finditer(content):
+        tag = m.group(1)
+        args = m.group(2).decode("utf-8", "replace").split()
+        if not args:
+            continue
+        value = args[0]
+        if tag == b"UNIT":
+            scale = _ZMX_UNIT_MM.get(value.upper(), 0.0)
+            if not scale:
+                raise ValueError(f"Unsupported ZMX lens unit '{value}'. Use MM, CM, IN or METER.")
+        elif tag == b"SURF":
+            try:
+                current = records.setdefault(int(value), {})
+            except ValueError:
+                current = None
+        elif current is None:
+            continue
+        elif tag == b"CURV":
+            current["Curvature"] = value
+        elif tag == b"DISZ":
+            current["Thickness"] = value
+        elif tag == b"GLAS":
+            # GLAS <name> <flags> <flags> <nd> <vd> ...
+            current["Material"] = value
+            if len(args) > 3:
+                current["nd"] = args[3]
+        else:
+            try:
+                current["Diameter"] = 2.0 * float(value)
+            except ValueError:
+                pass
+
+    indices = sorted(records)[1:-1]
+    surfaces: List[Dict[str, Any]] = []
+    for i, k in enumerate(indices):
+        raw = records[k]
+        material = raw.get("Material", "")
+        if material.upper() == "MIRROR":
+            raise ValueError(f"ZMX surface {k} is a mirror; reflective (folded) systems are not supported.")
+        if not material:
+            raw["Type"] = "Air"
+        if scale != 1.0:
+            for key, factor in (("Curvature", 1.0 / scale), ("Thickness", scale), ("Diameter", scale)):
+                try:
+                    raw[key] = float(raw[key]) * factor
+                except (KeyError, ValueError):
+                    pass
+        surface = _surface_from_dict(raw, i)
+        if material and get_material_by_name(material) is None:
+            try:
+                nd = float(raw.get("nd", ""))
+            except ValueError:
+                nd = 0.0
+            if not nd > 1.0:
+                raise ValueError(f"ZMX surface {k}: glass '{material}' is not in the library and has no nd.")
+            surface["refractiveIndex"] = nd
+        surfaces.append(surface)
+
+    if not surfaces:
+        raise ValueError("No surfaces found in ZMX file. Expected SURF blocks between object and image.")
+    return surfaces
+
+
 def _extract_surface_info_from_path(path) -> Tuple[Optional[float], float, float]:
     """
     Extract (radius, center_x, diameter) from an svgpathtools Path.
@@ -304,7 +448,7 @@ def _extract_surface_info_from_path(path) -> Tuple[Optional[float], float, float
         if hasattr(seg, "radius"):
             rx = abs(seg.radius.real)
             ry = abs(seg.radius.imag)
-            r = (rx * ry) ** 0.5 if (rx > 0 and ry > 0) else max(rx, ry)
+            r = math.sqrt(rx * ry) if (rx > 0 and ry > 0) else max(rx, ry)
             if r > 1e-6:
                 radii.append(r)
         # Collect points for centroid and extent
@@ -314,7 +458,7 @@ def _extract_surface_info_from_path(path) -> Tuple[Optional[float], float, float
             pts.append(seg.end)
         # Sample a few points for curves
         if hasattr(seg, "point"):
-            for t in (0, 0.5, 1):
+            for t in _SAMPLE_TS:
                 try:
                     pts.append(seg.point(t))
                 except Exception:
@@ -326,8 +470,7 @@ def _extract_surface_info_from_path(path) -> Tuple[Optional[float], float, float
     xs = [p.real for p in pts]
     ys = [p.imag for p in pts]
     center_x = (min(xs) + max(xs)) / 2
-    diameter = max(ys) - min(ys) if ys else 25.0
-    diameter = max(0.1, diameter)
+    diameter = max(0.1, max(ys) - min(ys))
 
     radius = (sum(radii) / len(radii)) if radii else None  # None = flat
     return radius, center_x, diameter
@@ -660,7 +803,7 @@ def import_from_svg(content: bytes) -> List[Dict[str, Any]]:
         )
 
         surfaces.append({
-            "id": str(uuid.uuid4()),
+            "id": _new_surface_id(),
             "type": surf_type,
             "radius": r_mm,
             "thickness": thickness,
@@ -677,16 +820,44 @@ def import_from_svg(content: bytes) -> List[Dict[str, Any]]:
     return surfaces
 
 
+# Recent imports keyed on (extension, blake2b of the file bytes), least recently used first
+_IMPORT_CACHE_SIZE = 32
+_import_cache: "OrderedDict[Tuple[str, bytes], List[Dict[str, Any]]]" = OrderedDict()
+
+# extension -> (importer, cache results). Only SVG and ZMX parsing costs more than the
+# hash + deepcopy of a cache hit; JSON is parsed again every time.
+_IMPORTERS = {
+    "json": (import_from_json, False),
+    "svg": (import_from_svg, True),
+    "zmx": (import_from_zmx, True),
+}
+
+
 def import_lens_system(content: bytes, filename: str) -> List[Dict[str, Any]]:
     """
     Import lens system from file content. Infers format from filename extension.
     Returns array of Surface objects for the frontend.
+    Re-importing identical SVG/ZMX bytes returns a fresh copy of the cached result with new surface ids.
     """
     ext = (filename or "").lower().split(".")[-1]
-    if ext == "json":
-        return import_from_json(content)
-    if ext == "svg":
-        return import_from_svg(content)
-    raise ValueError(
-        f"Unsupported file type '.{ext}'. Use .json (Zemax-style) or .svg."
-    )
+    entry = _IMPORTERS.get(ext)
+    if entry is None:
+        raise ValueError(
+            f"Unsupported file type '.{ext}'. Use .json (Zemax-style), .zmx or .svg."
+        )
+    importer, use_cache = entry
+    if not use_cache:
+        return importer(content)
+    key = (ext, hashlib.blake2b(content, digest_size=16).digest())
+    cached = _import_cache.get(key)
+    if cached is None:
+        cached = importer(content)
+        _import_cache[key] = cached
+        if len(_import_cache) > _IMPORT_CACHE_SIZE:
+            _import_cache.popitem(last=False)
+    else:
+        _import_cache.move_to_end(key)
+    surfaces = copy.deepcopy(cached)
+    for s in surfaces:
+        s["id"] = _new_surface_id()
+    return surfaces
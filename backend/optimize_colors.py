@@ -4,23 +4,96 @@ between 486 nm and 656 nm. Returns recommended second glass and estimated LCA re
 """
 
 import numpy as np
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Union
 
 from trace_service import optical_stack_to_surf_data
+from jit_utils import njit
 from glass_materials import (
-    get_all_materials,
     refractive_index_at_wavelength,
-    get_material_by_name,
+    n_from_sellmeier_array,
+    _load_sellmeier_table,
 )
 
+# Closed-form sweep results are re-checked with the full rayoptics model (_lca_for_doublet)
+# for this many (glass, c3) pairs
+_N_VALIDATE = 5
+
+
+@njit("float64(float64[:], float64[:], float64[:])", cache=True)
+def _paraxial_bfl(c, t, n):
+    """
+    Paraxial BFL: y-nu trace of an axis-parallel ray through surfaces with curvatures c
+    and thicknesses t; n holds len(c) + 1 indices (n[0] = object space, n[-1] = image space).
+    Zero-power systems return 0.0, as rayoptics' first-order data does.
+    """
+    y = 1.0
+    nu = 0.0
+    n_surf = len(c)
+    for i in range(n_surf):
+        nu = nu - y * c[i] * (n[i + 1] - n[i])
+        if i < n_surf - 1:
+            y = y + t[i] * nu / n[i + 1]
+    if nu == 0.0:
+        return 0.0
+    return -y * n[n_surf] / nu
+
+
+def _paraxial_inputs(surf_data_list: List[List[Any]], wvl_nm: float) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    (c, t, n) arrays for _paraxial_bfl, with n at wvl_nm from the same (n, V) medium rayoptics
+    builds. None when a row needs the full model (REFL/named media, mixed n/V types, non-air image).
+    """
+    n_surf = len(surf_data_list)
+    if n_surf == 0:
+        return None
+    c = np.empty(n_surf)
+    t = np.empty(n_surf)
+    n = np.empty(n_surf + 1)
+    n[0] = 1.0
+    for i, row in enumerate(surf_data_list):
+        if len(row) != 4:
+            return None
+        # rayoptics reads [n, v] as an (n, V) pair only when both have the same type
+        if type(row[2]) is not float or type(row[3]) is not float:
+            return None
+        if isinstance(row[0], bool) or not isinstance(row[0], (int, float)):
+            return None
+        if isinstance(row[1], bool) or not isinstance(row[1], (int, float)):
+            return None
+        c[i] = row[0]
+        t[i] = row[1]
+        n[i + 1] = _model_rindex(row[2], row[3], wvl_nm)
+    if n[-1] != 1.0:
+        return None
+    return c, t, n
+
 
 def _bfl_at_wavelength(
-    surf_data_list: List[List[float]],
+    surf_data_list: Union[List[List[float]], np.ndarray],
     wvl_nm: float,
     epd: float = 10.0,
     surface_diameters: Optional[List[float]] = None,
 ) -> float:
-    """Compute BFL (mm) for given surface data at wavelength."""
+    """Compute BFL (mm) for given surface data at wavelength (paraxial kernel, rayoptics fallback)."""
+    if isinstance(surf_data_list, np.ndarray):
+        # rayoptics reads [n, v] as a glass only when both are the same type: use Python floats
+        surf_data_list = surf_data_list.tolist()
+    inputs = _paraxial_inputs(surf_data_list, wvl_nm)
+    if inputs is not None:
+        bfl = _paraxial_bfl(*inputs)
+        return float(bfl) if np.isfinite(bfl) else float("nan")
+    return _bfl_rayoptics(surf_data_list, wvl_nm, epd, surface_diameters)
+
+
+def _bfl_rayoptics(
+    surf_data_list: List[List[Any]],
+    wvl_nm: float,
+    epd: float = 10.0,
+    surface_diameters: Optional[List[float]] = None,
+) -> float:
+    """BFL (mm) from a full rayoptics model build."""
     from singlet_rayoptics import build_singlet_from_surface_data, get_focal_length
 
     n_surf = len(surf_data_list)
@@ -48,59 +121,135 @@ def _bfl_at_wavelength(
     return float("nan")
 
 
-def _doublet_surf_data(
-    s1: Dict[str, Any],
-    s2_air: Dict[str, Any],
-    second_glass: str,
-    t2: float,
-    c3: float,
-    wvl_nm: float = 587.6,
-) -> List[List[float]]:
+@lru_cache(maxsize=4096)
+def _bfl_cached(surf_data_key: tuple, wvl_nm: float, epd: float, diams_key: tuple) -> float:
+    """_bfl_at_wavelength memoized on hashable (surf_data rows, wavelength, EPD, diameters)."""
+    return _bfl_at_wavelength([list(row) for row in surf_data_key], wvl_nm, epd, list(diams_key))
+
+
+@lru_cache(maxsize=1024)
+def _bfl_model_cached(surf_data_key: tuple, wvl_nm: float, epd: float, diams_key: tuple) -> float:
+    """_bfl_rayoptics memoized like _bfl_cached; always builds the full model (no paraxial kernel)."""
+    return _bfl_rayoptics([list(row) for row in surf_data_key], wvl_nm, epd, list(diams_key))
+
+
+def _surf_data_key(surf_data_list: Union[List[List[Any]], np.ndarray]) -> tuple:
+    """Freeze surf_data rows into nested tuples (of Python floats for arrays) for _bfl_cached."""
+    if isinstance(surf_data_list, np.ndarray):
+        surf_data_list = surf_data_list.tolist()
+    return tuple(tuple(row) for row in surf_data_list)
+
+
+@lru_cache(maxsize=1024)
+def _model_rindex(n: float, v: float, wvl_nm: float) -> float:
+    """Index rayoptics uses at wvl_nm for a surf_data (n, v) medium (ModelGlass fit to n and V)."""
+    from rayoptics.seq.medium import decode_medium
+    try:
+        return float(decode_medium(float(n), float(v)).rindex(wvl_nm))
+    except Exception:
+        return float("nan")
+
+
+# Sellmeier table the per-wavelength glass index entries were built from
+_glass_index_cache: Dict[str, Any] = {"table": None}
+
+
+@lru_cache(maxsize=8)
+def _glass_index_entry(wvl_nm: float) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Build the _glass_index_table entry for one design wavelength (last few kept)."""
+    names, B, C = _load_sellmeier_table()
+    n_design = n_from_sellmeier_array(wvl_nm, B, C)
+    v = np.where(n_design > 1.01, 64.2, 0.0)
+    n_486 = np.array([_model_rindex(n, vk, 486.0) for n, vk in zip(n_design, v)])
+    n_656 = np.array([_model_rindex(n, vk, 656.0) for n, vk in zip(n_design, v)])
+    for arr in (n_design, n_486, n_656):
+        arr.setflags(write=False)
+    return names, n_design, n_486, n_656
+
+
+def _glass_index_table(wvl_nm: float) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
     """
-    Build doublet surface data: [lens1 front], [cemented + lens2], [lens2 back].
-    s1: first lens surface (glass), s2_air: original air gap surface.
+    (names, n at wvl_nm, n at 486 nm, n at 656 nm) for every Sellmeier glass. The design
+    index comes from Sellmeier; 486/656 are what the doublet model's (n, V) ModelGlass gives.
+    Cached for the most recent design wavelengths; dropped when glass_materials reloads the library.
     """
-    r1 = float(s1.get("radius", 0) or 0)
-    t1 = float(s1.get("thickness", 0) or 0)
-    mat1 = s1.get("material") or ""
-    n1_fb = float(s1.get("refractiveIndex", 1.5) or 1.5)
-    n1 = refractive_index_at_wavelength(wvl_nm, mat1, n1_fb)
+    table = _load_sellmeier_table()
+    if _glass_index_cache["table"] is not table:
+        _glass_index_cache["table"] = table
+        _glass_index_entry.cache_clear()
+    return _glass_index_entry(float(wvl_nm))
 
-    r2 = float(s2_air.get("radius", 0) or 0)
-    t3 = float(s2_air.get("thickness", 0) or 0)
-    n2 = refractive_index_at_wavelength(wvl_nm, second_glass, 1.5)
 
-    c1 = 1.0 / r1 if r1 != 0 else 0.0
-    c2 = 1.0 / r2 if r2 != 0 else 0.0
+def _paraxial_bfl_doublet(c1, t1, n1, c2, t2, n2, c3):
+    """
+    Closed-form paraxial BFL of the doublet air | n1 | n2 | air: y-nu trace of a ray
+    parallel to the axis (object at infinity). Broadcasts over array arguments.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nu1 = -c1 * (n1 - 1.0)
+        y2 = 1.0 + t1 * nu1 / n1
+        nu2 = nu1 - y2 * c2 * (n2 - n1)
+        y3 = y2 + t2 * nu2 / n2
+        nu3 = nu2 - y3 * c3 * (1.0 - n2)
+        return -y3 / nu3
 
-    v1 = 64.2 if n1 > 1.01 else 0.0
-    v2 = 64.2 if n2 > 1.01 else 0.0
 
-    return [
-        [c1, t1, n1, v1],
-        [c2, t2, n2, v2],
-        [c3, t3, 1.0, 0.0],
-    ]
+@dataclass(frozen=True)
+class _DoubletCtx:
+    """Doublet inputs fixed for a stack: lens 1 front, cemented curvature, back gap, pupil, apertures."""
+    c1: float
+    t1: float
+    n1: float
+    v1: float
+    c2: float
+    t3: float
+    epd: float
+    diams_key: Tuple[float, float, float]
 
 
-def _lca_for_doublet(
-    optical_stack: dict,
-    second_glass: str,
-    t2: float,
-    c3: float,
-    wvl_nm: float = 587.6,
-) -> float:
-    """LCA = |BFL(486) - BFL(656)| for doublet with given second glass and geometry."""
+def _doublet_ctx(optical_stack: dict, wvl_nm: float = 587.6) -> _DoubletCtx:
+    """Build the _DoubletCtx once from the first glass surface and the air gap behind it."""
     surfaces = optical_stack.get("surfaces", [])
-    if len(surfaces) < 2:
-        return float("inf")
-    epd = float(optical_stack.get("entrancePupilDiameter", 10) or 10)
+    s1, s2_air = surfaces[0], surfaces[1]
+    r1 = float(s1.get("radius", 0) or 0)
+    mat1 = s1.get("material") or ""
+    n1_fb = float(s1.get("refractiveIndex", 1.5) or 1.5)
+    n1 = refractive_index_at_wavelength(wvl_nm, mat1, n1_fb)
+    r2 = float(s2_air.get("radius", 0) or 0)
     diams = [float(s.get("diameter", 25) or 25) for s in surfaces]
-    surf_data = _doublet_surf_data(surfaces[0], surfaces[1], second_glass, t2, c3, wvl_nm)
-    surface_diameters = [diams[0], diams[0], diams[1] if len(diams) > 1 else diams[0]]
+    return _DoubletCtx(
+        c1=1.0 / r1 if r1 != 0 else 0.0,
+        t1=float(s1.get("thickness", 0) or 0),
+        n1=n1,
+        v1=64.2 if n1 > 1.01 else 0.0,
+        c2=1.0 / r2 if r2 != 0 else 0.0,
+        t3=float(s2_air.get("thickness", 0) or 0),
+        epd=float(optical_stack.get("entrancePupilDiameter", 10) or 10),
+        diams_key=(diams[0], diams[0], diams[1]),
+    )
+
+
+def _doublet_surf_data(ctx: _DoubletCtx, n2: float, t2: float, c3: float) -> np.ndarray:
+    """
+    Build doublet surface data as a (3, 4) array of [c, t, n, v] rows:
+    [lens1 front], [cemented + lens2], [lens2 back].
+    n2: second glass index at the design wavelength.
+    """
+    out = np.empty((3, 4))
+    out[0] = (ctx.c1, ctx.t1, ctx.n1, ctx.v1)
+    out[1] = (ctx.c2, t2, n2, 64.2 if n2 > 1.01 else 0.0)
+    out[2] = (c3, ctx.t3, 1.0, 0.0)
+    return out
 
-    bfl_486 = _bfl_at_wavelength(surf_data, 486.0, epd, surface_diameters)
-    bfl_656 = _bfl_at_wavelength(surf_data, 656.0, epd, surface_diameters)
+
+def _lca_for_doublet(ctx: _DoubletCtx, n2: float, t2: float, c3: float) -> float:
+    """
+    LCA = |BFL(486) - BFL(656)| for the doublet with second-glass index n2 and geometry,
+    from the full rayoptics model so it independently checks the closed-form sweep.
+    """
+    key = _surf_data_key(_doublet_surf_data(ctx, n2, t2, c3))
+    bfl_486 = _bfl_model_cached(key, 486.0, ctx.epd, ctx.diams_key)
+    bfl_656 = _bfl_model_cached(key, 656.0, ctx.epd, ctx.diams_key)
     if not (np.isfinite(bfl_486) and np.isfinite(bfl_656)):
         return float("inf")
     return abs(bfl_486 - bfl_656)
@@ -118,7 +267,6 @@ def run_optimize_colors(optical_stack: dict) -> dict:
         return {"recommended_glass": "", "estimated_lca_reduction": 0.0}
 
     s1 = surfaces[0]
-    s2 = surfaces[1]
     mat1 = (s1.get("material") or "").strip()
     if not mat1 or mat1.lower() == "air":
         return {"recommended_glass": "", "estimated_lca_reduction": 0.0}
@@ -130,46 +278,51 @@ def run_optimize_colors(optical_stack: dict) -> dict:
     surf_data_singlet = optical_stack_to_surf_data(surfaces, wvl_nm=wvl_nm)
     surface_diameters = diams + [diams[-1]] if len(diams) < 3 else diams[:3]
 
-    bfl_486_s = _bfl_at_wavelength(surf_data_singlet, 486.0, epd, surface_diameters)
-    bfl_656_s = _bfl_at_wavelength(surf_data_singlet, 656.0, epd, surface_diameters)
+    singlet_key = _surf_data_key(surf_data_singlet)
+    bfl_486_s = _bfl_cached(singlet_key, 486.0, epd, tuple(surface_diameters))
+    bfl_656_s = _bfl_cached(singlet_key, 656.0, epd, tuple(surface_diameters))
     if not (np.isfinite(bfl_486_s) and np.isfinite(bfl_656_s)):
         return {"recommended_glass": "", "estimated_lca_reduction": 0.0}
 
     lca_singlet = abs(bfl_486_s - bfl_656_s)
 
-    materials = get_all_materials()
-    candidates = [
-        m for m in materials
-        if m.get("name") and m.get("name").lower() != "air"
-        and m.get("name").lower() != mat1.lower()
-    ]
-
-    t1 = float(s1.get("thickness", 5) or 5)
-    t2 = t1 * 0.5
-    r2 = float(s2.get("radius", 0) or 0)
-    c2 = 1.0 / r2 if r2 != 0 else 0.0
-
-    best_glass = ""
-    best_lca = float("inf")
-
-    c3_range = np.linspace(c2 - 0.03, c2 + 0.03, 15)
-
-    for m in candidates:
-        glass_name = m.get("name", "")
-        if not glass_name:
-            continue
-        mat = get_material_by_name(glass_name)
-        if not mat or mat.get("dispersion_formula") != "sellmeier":
-            continue
-        for c3 in c3_range:
-            lca = _lca_for_doublet(optical_stack, glass_name, t2, float(c3), wvl_nm)
-            if lca < best_lca:
-                best_lca = lca
-                best_glass = glass_name
-
-    if not best_glass:
+    # Candidate second glasses: every Sellmeier glass except lens 1's own
+    all_names, n_design_all, n_486_all, n_656_all = _glass_index_table(wvl_nm)
+    keep = [k for k, name in enumerate(all_names) if name.lower() not in ("air", mat1.lower())]
+    names = [all_names[k] for k in keep]
+
+    ctx = _doublet_ctx(optical_stack, wvl_nm)
+    t2 = float(s1.get("thickness", 5) or 5) * 0.5
+    c3_range = np.linspace(ctx.c2 - 0.03, ctx.c2 + 0.03, 15)
+
+    n2_design = n_design_all[keep]
+    lca_grid = np.full((len(names), len(c3_range)), np.inf)
+    if names:
+        bfl = {}
+        for wvl, n2_w in ((486.0, n_486_all[keep]), (656.0, n_656_all[keep])):
+            n1_w = _model_rindex(ctx.n1, ctx.v1, wvl)
+            bfl[wvl] = _paraxial_bfl_doublet(
+                ctx.c1, ctx.t1, n1_w, ctx.c2, t2, n2_w[:, None], c3_range[None, :]
+            )
+        lca_grid = np.abs(bfl[486.0] - bfl[656.0])
+        lca_grid[~np.isfinite(lca_grid)] = np.inf
+
+    # Confirm the best few (glass, c3) pairs with rayoptics; cells stay in sweep order so
+    # argmin (first minimum) breaks ties the same way a sequential scan would
+    top = np.sort(np.argsort(lca_grid, axis=None, kind="stable")[:_N_VALIDATE])
+    top = top[np.isfinite(lca_grid.ravel()[top])]
+    ks, js = np.unravel_index(top, lca_grid.shape)
+    checked = np.array(
+        [_lca_for_doublet(ctx, n2_design[k], t2, c3_range[j]) for k, j in zip(ks, js)],
+        dtype=np.float64,
+    )
+    if not np.isfinite(checked).any():
         return {"recommended_glass": "", "estimated_lca_reduction": 0.0}
 
+    best = int(np.argmin(checked))
+    best_glass = names[ks[best]]
+    best_lca = float(checked[best])
+
     reduction = max(0.0, lca_singlet - best_lca)
     return {
         "recommended_glass": best_glass,
@@ -0,0 +1,106 @@
+"""Unit tests for the cached CoatingService and reflectivity lookups in coatings.py."""
+
+from types import SimpleNamespace
+
+import pytest
+
+# Skip if the coating modules cannot be imported.
+# backend.trace_service puts backend/ on sys.path; coatings is imported flat, as the app does.
+try:
+    import backend.trace_service  # noqa: F401
+    import coatings
+    from backend.main import CoatingItem, get_coatings
+    COATINGS_AVAILABLE = True
+except ImportError:
+    COATINGS_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not COATINGS_AVAILABLE,
+    reason="coatings/main import failed",
+)
+
+
+def _user_coating(coating_id, name, r):
+    """User coating row as coating_db.get_all_user_coatings returns it."""
+    return {
+        "id": coating_id, "name": name, "category": "Custom", "data_type": "constant",
+        "description": "", "type": "AR", "constant_value": r,
+    }
+
+
+@pytest.fixture
+def user_db(monkeypatch):
+    """In-memory user coatings and a manual clock; counts database reads."""
+    db = SimpleNamespace(rows=[], reads=0, now=1000.0)
+
+    def get_all_user_coatings():
+        db.reads += 1
+        return [dict(r) for r in db.rows]
+
+    monkeypatch.setattr(coatings, "get_all_user_coatings", get_all_user_coatings)
+    monkeypatch.setattr(coatings, "time", SimpleNamespace(monotonic=lambda: db.now))
+    coatings.invalidate_coating_cache()
+    yield db
+    coatings.invalidate_coating_cache()
+
+
+class TestServiceCache:
+    """CoatingService is rebuilt only when the user-coating signature changes."""
+
+    def test_reused_within_ttl(self, user_db):
+        svc = coatings._get_cached_service()
+        user_db.rows.append(_user_coating(1, "Test AR", 0.01))
+        user_db.now += coatings._SERVICE_TTL_S / 2
+        assert coatings._get_cached_service() is svc
+        assert user_db.reads == 1
+
+    def test_ttl_expiry_rechecks_database(self, user_db):
+        svc = coatings._get_cached_service()
+        user_db.now += coatings._SERVICE_TTL_S + 0.1
+        assert coatings._get_cached_service() is svc
+        assert user_db.reads == 2
+
+    def test_changed_signature_rebuilds(self, user_db):
+        svc = coatings._get_cached_service()
+        assert coatings.get_reflectivity("Test AR", 550.0) != 0.01
+        user_db.rows.append(_user_coating(1, "Test AR", 0.01))
+        user_db.now += coatings._SERVICE_TTL_S + 0.1
+        assert coatings._get_cached_service() is not svc
+        assert coatings.get_reflectivity("Test AR", 550.0) == 0.01
+
+    def test_invalidate_drops_service_and_reflectivity(self, user_db):
+        svc = coatings._get_cached_service()
+        coatings.get_reflectivity("Test AR", 550.0)
+        assert coatings._reflectivity_cached.cache_info().currsize > 0
+        user_db.rows.append(_user_coating(1, "Test AR", 0.01))
+        coatings.invalidate_coating_cache()
+        assert coatings._svc_cache["svc"] is None
+        assert coatings._reflectivity_cached.cache_info().currsize == 0
+        # No TTL wait after an explicit invalidation
+        assert coatings.get_reflectivity("Test AR", 550.0) == 0.01
+        assert coatings._get_cached_service() is not svc
+
+
+class TestCoatingDropdown:
+    """Dropdown entries are plain dicts served through /api/coatings."""
+
+    def test_entries_are_dicts(self, user_db):
+        entries = coatings.get_all_coatings()
+        assert entries
+        assert all(type(c) is dict and set(c) == {"name", "description", "is_hr"} for c in entries)
+        # Callers get their own copies; the cached entries are not touched
+        entries[0]["name"] = "changed"
+        assert coatings.get_all_coatings()[0]["name"] != "changed"
+
+    def test_endpoint_serializes_dropdown(self, user_db):
+        items = get_coatings()
+        expected = coatings.get_all_coatings()
+        assert all(isinstance(item, CoatingItem) for item in items)
+        assert [item.model_dump() for item in items] == expected
+
+    def test_custom_coating_listed_after_invalidate(self, user_db):
+        assert "Test AR" not in [c["name"] for c in coatings.get_all_coatings()]
+        user_db.rows.append(_user_coating(1, "Test AR", 0.01))
+        coatings.invalidate_coating_cache()
+        assert "Test AR" in [c["name"] for c in coatings.get_all_coatings()]
+        assert "Test AR" in [item.name for item in get_coatings()]
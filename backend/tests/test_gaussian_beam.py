@@ -0,0 +1,167 @@
+"""Unit tests for Gaussian beam (ABCD) propagation."""
+
+import math
+import numpy as np
+import pytest
+from backend.gaussian_beam import (
+    compute_gaussian_beam,
+    _beam_radii_from_q,
+    _beam_radii_at_z,
+    _abcd_propagate,
+    _compute_gaussian_beam_impl,
+    _paraxial_efl,
+    _propagate_chain,
+    _q_to_waist_rayleigh,
+)
+
+
+@pytest.fixture
+def singlet_surf_data():
+    """Singlet: R=100 front, R=-100 back, 5mm thick, n=1.5168, 95mm to image."""
+    return [
+        [0.01, 5.0, 1.5168, 64.2],
+        [-0.01, 95.0, 1.0, 0.0],
+    ]
+
+
+@pytest.fixture
+def six_element_surf_data():
+    """Six singlets in a row (12 surfaces), mixed powers and spacings."""
+    rows = []
+    for k in range(6):
+        c = 0.02 / (1 + k) * (-1) ** k
+        rows.append([c, 4.0 + k, 1.5168 if k % 2 == 0 else 1.6727, 64.2])
+        rows.append([-c * 0.5, 8.0 + 3 * k, 1.0, 0.0])
+    return rows
+
+
+def _reference_beam(surf_data_list, epd_mm, wvl_nm, m2, n_samples):
+    """Scalar, per-sample version of _compute_gaussian_beam_impl (complex q through each step)."""
+    wvl_mm = wvl_nm * 1e-6
+    w0_entrance = (epd_mm / 2.0) * 0.9
+    z_r_entrance = math.pi * w0_entrance ** 2 / (wvl_mm * m2)
+
+    def w_from_q(q):
+        return math.sqrt(wvl_mm * abs(q) ** 2 / (math.pi * q.imag)) if q.imag > 0 else 0.0
+
+    envelope = []
+    for z in np.linspace(-50.0, 0.0, max(5, n_samples // 10)):
+        envelope.append([float(z), w0_entrance * math.sqrt(1.0 + (z / z_r_entrance) ** 2)])
+
+    q = 1j * z_r_entrance
+    z_trace = 0.0
+    n_before = 1.0
+    for curv, thick, n_after, _v in surf_data_list:
+        r_mm = 1.0 / curv if abs(curv) > 1e-12 else 1e6
+        q = _abcd_propagate(q, 1.0, 0.0, (n_before - n_after) / (r_mm * n_after), n_before / n_after)
+        n_steps = max(3, int(thick / 2))
+        for k in range(n_steps + 1):
+            dz = thick * k / n_steps
+            envelope.append([z_trace + dz, w_from_q(q + dz)])
+        q = q + thick
+        z_trace += thick
+        n_before = n_after
+
+    focus_z = z_trace + _paraxial_efl(surf_data_list)
+    w0_focus, z_r_focus = _q_to_waist_rayleigh(q + (focus_z - z_trace), wvl_mm)
+    for z in np.linspace(z_trace, focus_z + 2 * z_r_focus, n_samples):
+        envelope.append([float(z), w0_focus * math.sqrt(1.0 + ((z - focus_z) / z_r_focus) ** 2)])
+    envelope.sort(key=lambda p: p[0])
+    return envelope, w0_focus, z_r_focus, focus_z
+
+
+class TestComputeGaussianBeam:
+    """Tests for compute_gaussian_beam envelope and focus values."""
+
+    def test_envelope_sorted_by_z(self, singlet_surf_data):
+        """Envelope points should be [z, w] pairs in non-decreasing z."""
+        gb = compute_gaussian_beam(singlet_surf_data, epd_mm=10.0, wvl_nm=632.8)
+        env = gb["beamEnvelope"]
+        assert len(env) > 0
+        for i in range(1, len(env)):
+            assert env[i][0] >= env[i - 1][0]
+        for z, w in env:
+            assert isinstance(z, float)
+            assert isinstance(w, float)
+            assert w >= 0
+
+    def test_envelope_sample_count(self, singlet_surf_data):
+        """Pre-focus + per-surface sub-steps + post-focus samples."""
+        n_samples = 80
+        gb = compute_gaussian_beam(singlet_surf_data, epd_mm=10.0, wvl_nm=632.8, n_samples=n_samples)
+        # max(3, int(t / 2)) steps per thickness, plus the surface point itself
+        n_mid = (3 + 1) + (47 + 1)
+        assert len(gb["beamEnvelope"]) == max(5, n_samples // 10) + n_mid + n_samples
+
+    def test_envelope_starts_at_entrance_waist(self, singlet_surf_data):
+        """At z=0 the envelope should equal the entrance waist (0.9 * EPD/2)."""
+        gb = compute_gaussian_beam(singlet_surf_data, epd_mm=10.0, wvl_nm=632.8)
+        w_at_zero = [w for z, w in gb["beamEnvelope"] if z == 0.0]
+        assert w_at_zero
+        assert abs(w_at_zero[0] - 4.5) < 1e-9
+
+    def test_focus_override(self, singlet_surf_data):
+        """focus_z_override sets both focusZ and waistZ."""
+        gb = compute_gaussian_beam(singlet_surf_data, epd_mm=10.0, wvl_nm=632.8, focus_z_override=120.0)
+        assert gb["focusZ"] == 120.0
+        assert gb["waistZ"] == 120.0
+        assert gb["spotSizeAtFocus"] > 0
+        assert gb["rayleighRange"] > 0
+
+
+class TestUncachedMatchesReference:
+    """Uncached array implementation must match a per-sample scalar trace."""
+
+    def test_twelve_surfaces(self, six_element_surf_data):
+        gb = _compute_gaussian_beam_impl(six_element_surf_data, 10.0, 632.8, 1.3, 60, None)
+        envelope, w0_focus, z_r_focus, focus_z = _reference_beam(six_element_surf_data, 10.0, 632.8, 1.3, 60)
+        assert gb["spotSizeAtFocus"] == pytest.approx(w0_focus, rel=1e-9)
+        assert gb["rayleighRange"] == pytest.approx(z_r_focus, rel=1e-9)
+        assert gb["focusZ"] == pytest.approx(focus_z, rel=1e-12)
+        assert len(gb["beamEnvelope"]) == len(envelope)
+        assert np.allclose(gb["beamEnvelope"], envelope, rtol=1e-9, atol=1e-12)
+
+
+class TestBeamRadiusFromQ:
+    """Vectorized w(q) must match w² = λ/π * |q|² / Im(q)."""
+
+    def test_matches_formula(self):
+        qs = [complex(0.0, 100.0), complex(25.0, 100.0), complex(-40.0, 3.0), complex(5.0, 0.0), complex(1.0, -2.0)]
+        wvl_mm = 632.8e-6
+        ws = _beam_radii_from_q(qs, wvl_mm)
+        for q, w in zip(qs, ws):
+            expected = math.sqrt(wvl_mm * abs(q) ** 2 / (math.pi * q.imag)) if q.imag > 0 else 0.0
+            assert math.isclose(float(w), expected, rel_tol=1e-12, abs_tol=0.0)
+
+
+class TestBeamRadiusAtZ:
+    """Vectorized w(z) must match w0 * sqrt(1 + (z/z_R)²)."""
+
+    def test_matches_formula(self):
+        w0, z_r = 0.05, 12.5
+        zs = [-50.0, -12.5, 0.0, 3.0, 40.0]
+        ws = _beam_radii_at_z(w0, z_r, zs)
+        for z, w in zip(zs, ws):
+            assert math.isclose(float(w), w0 * math.sqrt(1.0 + (z / z_r) ** 2), rel_tol=1e-12, abs_tol=0.0)
+
+
+class TestPropagateChain:
+    """Float-pair ABCD chain must match complex _abcd_propagate step by step."""
+
+    def test_matches_complex_propagation(self, singlet_surf_data):
+        curv = np.array([row[0] for row in singlet_surf_data])
+        thick = np.array([row[1] for row in singlet_surf_data])
+        n_after = np.array([row[2] for row in singlet_surf_data])
+        n_before = np.concatenate(([1.0], n_after[:-1]))
+        c_refract = (n_before - n_after) * curv / n_after
+        d_refract = n_before / n_after
+        q = complex(0.0, 120.0)
+        q_re, q_im, q_r, q_i, z = _propagate_chain(c_refract, d_refract, thick, q.real, q.imag)
+        for i in range(len(thick)):
+            q = _abcd_propagate(q, 1.0, 0.0, c_refract[i], d_refract[i])
+            assert math.isclose(q_re[i], q.real, rel_tol=1e-12)
+            assert math.isclose(q_im[i], q.imag, rel_tol=1e-12)
+            q = q + thick[i]
+        assert math.isclose(q_r, q.real, rel_tol=1e-12)
+        assert math.isclose(q_i, q.imag, rel_tol=1e-12)
+        assert z == pytest.approx(100.0)
@@ -0,0 +1,52 @@
+"""Unit tests for the /api/trace response cache."""
+
+import json
+
+import pytest
+
+# Skip if the API cannot be imported (fastapi/rayoptics dependency)
+try:
+    import backend.main as api
+    from backend.main import OpticalStackRequest, UserCoatingCreate, _trace_body_cached
+    API_AVAILABLE = True
+except ImportError:
+    API_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not API_AVAILABLE,
+    reason="main/fastapi import failed",
+)
+
+
+@pytest.fixture
+def singlet_request():
+    return OpticalStackRequest(surfaces=[
+        {"id": "s1", "type": "Glass", "radius": 100, "thickness": 5, "refractiveIndex": 1.5168,
+         "diameter": 25, "material": "N-BK7", "description": ""},
+        {"id": "s2", "type": "Air", "radius": -100, "thickness": 95, "refractiveIndex": 1.0,
+         "diameter": 25, "material": "Air", "description": ""},
+    ], numRays=3)
+
+
+class TestTraceCache:
+    """Identical trace requests are served from _trace_body_cached."""
+
+    def test_second_identical_request_hits_cache(self, singlet_request):
+        _trace_body_cached.cache_clear()
+        first = api.trace_rays(singlet_request)
+        second = api.trace_rays(singlet_request.model_copy(deep=True))
+        info = _trace_body_cached.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+        assert first.body == second.body
+        assert "rays" in json.loads(second.body)
+
+    def test_coating_insert_clears_cache(self, singlet_request, monkeypatch):
+        import coating_db  # flat module, as main imports it
+
+        monkeypatch.setattr(coating_db, "insert_user_coating", lambda **kwargs: {"name": kwargs["name"]})
+        _trace_body_cached.cache_clear()
+        api.trace_rays(singlet_request)
+        assert _trace_body_cached.cache_info().currsize == 1
+        api.create_custom_coating(UserCoatingCreate(name="Test AR", data_type="constant", constant_value=0.01))
+        assert _trace_body_cached.cache_info().currsize == 0
@@ -0,0 +1,138 @@
+"""Unit tests for Monte Carlo tolerance jitter and spot collection."""
+
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+# Skip if monte_carlo_service cannot be imported (rayoptics dependency)
+try:
+    import backend.monte_carlo_service as mc_service
+    from backend.monte_carlo_service import run_monte_carlo, _build_jittered
+    MC_AVAILABLE = True
+except ImportError:
+    MC_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not MC_AVAILABLE,
+    reason="monte_carlo_service/rayoptics import failed",
+)
+
+
+@pytest.fixture
+def toleranced_singlet_stack():
+    """Singlet with radius/thickness tolerances on both surfaces."""
+    return {
+        "surfaces": [
+            {
+                "id": "s1", "type": "Glass", "radius": 100, "thickness": 5,
+                "refractiveIndex": 1.5168, "diameter": 25, "material": "N-BK7",
+                "description": "Front", "radiusTolerance": 0.5, "thicknessTolerance": 0.1,
+            },
+            {
+                "id": "s2", "type": "Air", "radius": -100, "thickness": 95,
+                "refractiveIndex": 1.0, "diameter": 25, "material": "Air",
+                "description": "Back", "radiusTolerance": 0.5, "thicknessTolerance": 0.2,
+            },
+        ],
+        "entrancePupilDiameter": 10,
+        "wavelengths": [587.6],
+        "fieldAngles": [0],
+        "numRays": 5,
+    }
+
+
+class TestBuildJittered:
+    """Tests for the vectorized jitter kernel."""
+
+    def test_shape_and_tolerance_bounds(self):
+        radius = np.array([100.0, -100.0, 0.0])
+        thickness = np.array([5.0, 95.0, 0.005])
+        n_idx = np.array([1.5168, 1.0, 1.0])
+        v_num = np.array([64.2, 0.0, 0.0])
+        r_tol = np.array([0.5, 0.0, 0.0])
+        t_tol = np.array([0.1, 0.2, 0.001])
+        u = np.random.default_rng(0).uniform(-1.0, 1.0, size=(50, 3, 2))
+        out = _build_jittered(radius, thickness, n_idx, v_num, r_tol, t_tol, u)
+        assert out.shape == (50, 3, 4)
+        r = 1.0 / out[:, 0, 0]
+        assert np.all(np.abs(r - 100.0) <= 0.5 + 1e-9)
+        # Zero tolerance: radius unchanged; flat surface keeps curvature 0
+        assert np.allclose(out[:, 1, 0], -0.01)
+        assert np.all(out[:, 2, 0] == 0.0)
+        assert np.all(np.abs(out[:, 1, 1] - 95.0) <= 0.2 + 1e-9)
+        # Thickness is clamped to 0.01 mm
+        assert np.all(out[:, 2, 1] >= 0.01)
+        assert np.all(out[:, :, 2] == n_idx)
+        assert np.all(out[:, :, 3] == v_num)
+
+
+class TestRunMonteCarlo:
+    """Tests for run_monte_carlo output shape."""
+
+    def test_returns_spots_and_spread(self, toleranced_singlet_stack):
+        result = run_monte_carlo(toleranced_singlet_stack, iterations=5)
+        assert result.get("error") is None
+        assert result["numValid"] == len(result["spots"])
+        assert result["numValid"] > 0
+        for pt in result["spots"]:
+            assert len(pt) == 2
+        assert result["rmsSpread"] >= 0
+        assert len(result["sensitivityBySurface"]) == 2
+
+    def test_sensitivity_only_for_toleranced_surfaces(self, toleranced_singlet_stack):
+        back = toleranced_singlet_stack["surfaces"][1]
+        back["radiusTolerance"] = back["thicknessTolerance"] = 0
+        result = run_monte_carlo(toleranced_singlet_stack, iterations=5)
+        assert result["sensitivityBySurface"][0] > 0
+        assert result["sensitivityBySurface"][1] == 0.0
+
+    def test_no_surfaces_returns_error(self):
+        result = run_monte_carlo({"surfaces": []}, iterations=5)
+        assert result["error"] == "No surfaces"
+        assert result["spots"] == []
+
+    def test_negative_iterations_returns_no_valid_traces(self, toleranced_singlet_stack):
+        result = run_monte_carlo(toleranced_singlet_stack, iterations=-3)
+        assert result["error"] == "No valid traces"
+        assert result["spots"] == []
+
+    def test_process_pool_matches_serial(self, toleranced_singlet_stack, monkeypatch):
+        serial = run_monte_carlo(toleranced_singlet_stack, iterations=6)
+        monkeypatch.setattr(mc_service, "_MIN_ITERATIONS_PER_WORKER", 2)
+        monkeypatch.setattr(mc_service.os, "cpu_count", lambda: 2)
+
+        def no_serial(*args, **kwargs):
+            raise AssertionError("serial fallback used instead of the process pool")
+
+        monkeypatch.setattr(mc_service, "_run_iterations", no_serial)
+        pooled = run_monte_carlo(toleranced_singlet_stack, iterations=6)
+        assert pooled["spots"] == serial["spots"]
+        assert pooled["rmsSpread"] == serial["rmsSpread"]
+        assert pooled["sensitivityBySurface"] == serial["sensitivityBySurface"]
+
+    def test_broken_pool_falls_back_to_serial(self, toleranced_singlet_stack, monkeypatch):
+        serial = run_monte_carlo(toleranced_singlet_stack, iterations=6)
+        monkeypatch.setattr(mc_service, "_MIN_ITERATIONS_PER_WORKER", 2)
+        monkeypatch.setattr(mc_service.os, "cpu_count", lambda: 2)
+
+        def broken_pool(*args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+        warnings = []
+        monkeypatch.setattr(mc_service, "ProcessPoolExecutor", broken_pool)
+        monkeypatch.setattr(mc_service.logger, "warning", lambda msg, *args: warnings.append(msg % args))
+        fallback = run_monte_carlo(toleranced_singlet_stack, iterations=6)
+        assert fallback["spots"] == serial["spots"]
+        assert len(warnings) == 1 and "running 6 iterations serially" in warnings[0]
+
+    def test_pool_bug_is_not_swallowed(self, toleranced_singlet_stack, monkeypatch):
+        monkeypatch.setattr(mc_service, "_MIN_ITERATIONS_PER_WORKER", 2)
+        monkeypatch.setattr(mc_service.os, "cpu_count", lambda: 2)
+
+        def buggy_pool(*args, **kwargs):
+            raise TypeError("bad worker arguments")
+
+        monkeypatch.setattr(mc_service, "ProcessPoolExecutor", buggy_pool)
+        with pytest.raises(TypeError):
+            run_monte_carlo(toleranced_singlet_stack, iterations=6)
@@ -0,0 +1,173 @@
+"""Unit tests for lens file import (JSON, Zemax .zmx, SVG path geometry)."""
+
+import json
+
+import pytest
+from svgpathtools import parse_path
+
+import backend.optical_importer as importer
+from backend.optical_importer import (
+    _extract_surface_info_from_path,
+    _surface_from_dict,
+    import_from_json,
+    import_from_zmx,
+    import_lens_system,
+)
+
+_ZMX = b"""VERS 190513 80 123457 L123457
+MODE SEQ
+UNIT MM X W X CM MR CPMM
+SURF 0
+  TYPE STANDARD
+  CURV 0.0 0 0 0 0 ""
+  DISZ INFINITY
+SURF 1
+  STOP
+  TYPE STANDARD
+  CURV 0.02 0 0 0 0 ""
+  DISZ 6.0
+  GLAS N-BK7 0 0 1.5168 64.17 0 0 0 0 0 0
+  DIAM 12.7 1 0 0 1 ""
+SURF 2
+  TYPE STANDARD
+  CURV -0.02 0 0 0 0 ""
+  DISZ 95.0
+  DIAM 12.7 1 0 0 1 ""
+SURF 3
+  TYPE STANDARD
+  CURV 0.0 0 0 0 0 ""
+  DISZ 0
+"""
+
+
+def _without_ids(surfaces):
+    """Surfaces with the random id dropped, for comparing two imports."""
+    return [{k: v for k, v in s.items() if k != "id"} for s in surfaces]
+
+
+class TestImportZmx:
+    """SURF records map to Surface dicts between object and image."""
+
+    def test_object_and_image_dropped(self):
+        surfaces = import_from_zmx(_ZMX)
+        assert len(surfaces) == 2
+        assert surfaces[0]["material"] == "N-BK7"
+        assert surfaces[0]["radius"] == pytest.approx(50.0)
+        assert surfaces[0]["thickness"] == 6.0
+        assert surfaces[1]["type"] == "Air"
+        assert surfaces[1]["radius"] == pytest.approx(-50.0)
+        assert surfaces[1]["thickness"] == 95.0
+
+    def test_diam_is_semi_diameter(self):
+        assert all(s["diameter"] == pytest.approx(25.4) for s in import_from_zmx(_ZMX))
+
+    def test_utf16_bom(self):
+        utf16 = _ZMX.decode("utf-8").replace("\n", "\r\n").encode("utf-16")
+        assert _without_ids(import_from_zmx(utf16)) == _without_ids(import_from_zmx(_ZMX))
+
+    def test_model_glass_uses_nd(self):
+        content = _ZMX.replace(b"GLAS N-BK7 0 0 1.5168", b"GLAS ___BLANK 1 0 1.7")
+        surfaces = import_from_zmx(content)
+        assert surfaces[0]["refractiveIndex"] == 1.7
+
+    def test_unknown_glass_without_nd_rejected(self):
+        content = _ZMX.replace(b"GLAS N-BK7 0 0 1.5168 64.17 0 0 0 0 0 0", b"GLAS NOT-A-GLASS")
+        with pytest.raises(ValueError, match="not in the library"):
+            import_from_zmx(content)
+
+    def test_mirror_rejected(self):
+        with pytest.raises(ValueError, match="mirror"):
+            import_from_zmx(_ZMX.replace(b"GLAS N-BK7", b"GLAS MIRROR"))
+
+    def test_no_surfaces(self):
+        with pytest.raises(ValueError, match="No surfaces found"):
+            import_lens_system(b"VERS 1\nMODE SEQ\n", "lens.zmx")
+
+
+    def test_inch_units_scaled_to_mm(self):
+        surfaces = import_from_zmx(_ZMX.replace(b"UNIT MM", b"UNIT IN"))
+        assert surfaces[0]["radius"] == pytest.approx(50.0 * 25.4)
+        assert surfaces[0]["thickness"] == pytest.approx(6.0 * 25.4)
+        assert surfaces[0]["diameter"] == pytest.approx(25.4 * 25.4)
+        assert surfaces[1]["thickness"] == pytest.approx(95.0 * 25.4)
+
+    def test_unknown_unit_rejected(self):
+        with pytest.raises(ValueError, match="Unsupported ZMX lens unit"):
+            import_from_zmx(_ZMX.replace(b"UNIT MM", b"UNIT FT"))
+
+class TestImportJson:
+    """JSON parsing (orjson with stdlib fallback) and surface key priority."""
+
+    def test_nan_and_infinity_literals_parse(self):
+        content = b'{"surfaces": [{"radius": Infinity, "thickness": NaN}, {"radius": -50, "thickness": 10}]}'
+        surfaces = import_from_json(content)
+        assert len(surfaces) == 2
+        assert surfaces[1]["radius"] == -50.0
+
+    def test_invalid_json_raises(self):
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            import_from_json(b"{not json")
+
+    def test_zero_radius_falls_back_to_curvature(self):
+        assert _surface_from_dict({"Radius": 0, "CURV": 0.02}, 0)["radius"] == pytest.approx(50.0)
+
+    def test_first_truthy_radius_spelling_wins(self):
+        # Same as the former chained `or`: a zero Radius does not shadow radius
+        assert _surface_from_dict({"Radius": 0, "radius": 25}, 0)["radius"] == 25.0
+        assert _surface_from_dict({"Radius": 30, "radius": 25}, 0)["radius"] == 30.0
+
+    def test_thickness_priority_skips_empty(self):
+        raw = {"Thickness": "", "thickness": "abc", "T": 4, "spacing": 9}
+        assert _surface_from_dict(raw, 0)["thickness"] == 4.0
+
+
+class TestImportCache:
+    """Repeated imports of identical bytes are served from the content-hash cache."""
+
+    def test_cache_hit_returns_copy_with_fresh_ids(self, monkeypatch):
+        monkeypatch.setattr(importer, "_import_cache", type(importer._import_cache)())
+        first = import_lens_system(_ZMX, "lens.zmx")
+
+        def not_called(_content):
+            raise AssertionError("importer re-ran on a cache hit")
+
+        monkeypatch.setitem(importer._IMPORTERS, "zmx", (not_called, True))
+        first[0]["radius"] = 999.0
+        second = import_lens_system(_ZMX, "lens.zmx")
+        assert second[0]["radius"] == pytest.approx(50.0)
+        assert second[0]["id"] != first[0]["id"]
+
+    def test_json_not_cached(self, monkeypatch):
+        monkeypatch.setattr(importer, "_import_cache", type(importer._import_cache)())
+        content = json.dumps({"surfaces": [{"radius": 50, "thickness": 5, "material": "N-BK7"}]}).encode()
+        first = import_lens_system(content, "lens.json")
+        second = import_lens_system(content, "lens.json")
+        assert len(importer._import_cache) == 0
+        assert _without_ids(second) == _without_ids(first)
+
+    def test_unsupported_extension(self):
+        with pytest.raises(ValueError, match="Unsupported file type"):
+            import_lens_system(b"", "lens.txt")
+
+
+class TestSvgPathInfo:
+    """Extent and centroid from sampled segment points (start, end, t = 0 / 0.5 / 1)."""
+
+    def test_arc(self):
+        radius, center_x, diameter = _extract_surface_info_from_path(parse_path("M 10 0 A 20 20 0 0 1 10 40"))
+        assert radius == pytest.approx(20.0)
+        assert center_x == pytest.approx(20.0)
+        assert diameter == pytest.approx(40.0)
+
+    def test_quadratic_bezier(self):
+        radius, center_x, diameter = _extract_surface_info_from_path(parse_path("M 0 0 Q 10 10 0 20"))
+        assert radius is None
+        assert center_x == pytest.approx(2.5)
+        assert diameter == pytest.approx(20.0)
+
+    def test_mixed_segments(self):
+        path = parse_path("M 10 0 A 20 20 0 0 1 10 40 L 0 40 Q 10 20 0 0")
+        radius, center_x, diameter = _extract_surface_info_from_path(path)
+        assert radius == pytest.approx(20.0)
+        assert center_x == pytest.approx(15.0)
+        assert diameter == pytest.approx(40.0)
@@ -0,0 +1,181 @@
+"""Unit tests for the doublet glass-pairing sweep (closed-form BFL vs rayoptics)."""
+
+import math
+import numpy as np
+import pytest
+
+# Skip if optimize_colors cannot be imported (rayoptics dependency).
+# backend.trace_service puts backend/ on sys.path for the flat imports in optimize_colors.
+try:
+    import backend.trace_service  # noqa: F401
+    from backend.optimize_colors import (
+        _bfl_at_wavelength,
+        _bfl_rayoptics,
+        _doublet_ctx,
+        _doublet_surf_data,
+        _glass_index_entry,
+        _glass_index_table,
+        _lca_for_doublet,
+        _model_rindex,
+        _paraxial_bfl_doublet,
+        run_optimize_colors,
+    )
+    from backend.glass_materials import (
+        _load_sellmeier_table,
+        get_material_by_name,
+        n_from_sellmeier_array,
+        refractive_index_at_wavelength,
+        reload_library,
+    )
+    OC_AVAILABLE = True
+except ImportError:
+    OC_AVAILABLE = False
+
+pytestmark = pytest.mark.skipif(
+    not OC_AVAILABLE,
+    reason="optimize_colors/rayoptics import failed",
+)
+
+
+class TestSellmeierTable:
+    """Vectorized Sellmeier over the SoA table must match the per-material lookup."""
+
+    def test_matches_scalar_lookup(self):
+        names, B, C = _load_sellmeier_table()
+        assert len(names) > 0
+        n = n_from_sellmeier_array(486.0, B, C)
+        for name, n_k in zip(names, n):
+            assert float(n_k) == refractive_index_at_wavelength(486.0, name, 1.5)
+
+
+class TestGlassLookupCache:
+    """Cached lookups normalize names and are dropped on library reload."""
+
+    def test_normalized_names_share_entry(self):
+        assert refractive_index_at_wavelength(587.6, " n-bk7 ", 1.5) == refractive_index_at_wavelength(
+            587.6, "N-BK7", 1.5
+        )
+        assert get_material_by_name(" N-BK7") is get_material_by_name("n-bk7")
+
+    def test_reload_clears_cache(self):
+        before = get_material_by_name("N-BK7")
+        reload_library()
+        after = get_material_by_name("N-BK7")
+        assert after is not before
+        assert after == before
+
+
+class TestGlassIndexTable:
+    """Per-wavelength glass index table matches per-glass lookups and follows library reloads."""
+
+    def test_matches_model_rindex(self):
+        names, n_design, n_486, n_656 = _glass_index_table(587.6)
+        assert len(names) == len(n_design) == len(n_486) == len(n_656) > 0
+        for n, n_b, n_r in zip(n_design, n_486, n_656):
+            v = 64.2 if n > 1.01 else 0.0
+            assert n_b == _model_rindex(float(n), v, 486.0)
+            assert n_r == _model_rindex(float(n), v, 656.0)
+
+    def test_rebuilt_after_reload(self):
+        # optimize_colors imports glass_materials flat (backend/ on sys.path), not as backend.glass_materials
+        import glass_materials
+
+        before = _glass_index_table(587.6)
+        assert _glass_index_table(587.6) is before
+        glass_materials.reload_library()
+        assert _glass_index_table(587.6) is not before
+
+    def test_cache_is_bounded(self):
+        for k in range(20):
+            _glass_index_table(500.0 + k)
+        assert _glass_index_entry.cache_info().currsize <= 8
+
+
+class TestParaxialBflDoublet:
+    """Closed-form doublet BFL must agree with the rayoptics paraxial model."""
+
+    @pytest.mark.parametrize("wvl_nm", [486.0, 656.0])
+    def test_matches_rayoptics(self, wvl_nm):
+        c1, t1, n1 = 0.01, 5.0, 1.5168
+        c2, t2, n2 = -0.012, 2.5, 1.7847
+        c3 = -0.002
+        surf_data = [[c1, t1, n1, 64.2], [c2, t2, n2, 64.2], [c3, 90.0, 1.0, 0.0]]
+        ref = _bfl_rayoptics(surf_data, wvl_nm, 10.0, [25.0, 25.0, 25.0])
+        bfl = _paraxial_bfl_doublet(
+            c1, t1, _model_rindex(n1, 64.2, wvl_nm), c2, t2, _model_rindex(n2, 64.2, wvl_nm), c3
+        )
+        assert math.isclose(float(bfl), ref, rel_tol=1e-9)
+
+
+class TestBflAtWavelength:
+    """Paraxial fast path must agree with the full rayoptics model."""
+
+    @pytest.mark.parametrize("surf_data", [
+        [[0.01, 5.0, 1.5168, 64.2], [-0.01, 95.0, 1.0, 0.0]],
+        [[0.02, 4.0, 1.62, 60.0], [-0.015, 2.0, 1.0, 0.0], [0.0, 3.0, 1.5168, 64.2], [-0.01, 40.0, 1.0, 0.0]],
+        [[0.0, 5.0, 1.5, 64.0], [0.0, 10.0, 1.0, 0.0]],  # zero power
+    ])
+    def test_matches_rayoptics(self, surf_data):
+        for wvl_nm in (486.0, 656.0):
+            fast = _bfl_at_wavelength(surf_data, wvl_nm)
+            ref = _bfl_rayoptics(surf_data, wvl_nm)
+            assert math.isclose(fast, ref, rel_tol=1e-9, abs_tol=1e-12)
+
+    def test_array_surf_data_matches_lists(self):
+        # ndarray rows hold np.float64; they must still be read as (n, V) glasses
+        surf_data = [[0.01, 5.0, 1.5168, 64.2], [-0.012, 2.5, 1.7847, 64.2], [-0.002, 90.0, 1.0, 0.0]]
+        for wvl_nm in (486.0, 656.0):
+            assert _bfl_at_wavelength(np.array(surf_data), wvl_nm) == _bfl_at_wavelength(surf_data, wvl_nm)
+
+
+class TestLcaForDoublet:
+    """Top-cell re-check uses the full rayoptics model, not the paraxial kernel."""
+
+    def test_uses_rayoptics_model(self, monkeypatch):
+        import backend.optimize_colors as oc
+
+        stack = {"surfaces": [
+            {"radius": 100, "thickness": 5, "refractiveIndex": 1.5168, "diameter": 25, "material": "N-BK7"},
+            {"radius": -100, "thickness": 95, "refractiveIndex": 1.0, "diameter": 25, "material": "Air"},
+        ], "entrancePupilDiameter": 10}
+        ctx = _doublet_ctx(stack)
+        surf_data = _doublet_surf_data(ctx, 1.7847, 2.5, -0.015).tolist()
+        expected = abs(
+            _bfl_rayoptics(surf_data, 486.0, ctx.epd, list(ctx.diams_key))
+            - _bfl_rayoptics(surf_data, 656.0, ctx.epd, list(ctx.diams_key))
+        )
+
+        def no_kernel(*args):
+            raise AssertionError("paraxial kernel used for the re-check")
+
+        monkeypatch.setattr(oc, "_paraxial_bfl", no_kernel)
+        assert _lca_for_doublet(ctx, 1.7847, 2.5, -0.015) == expected
+
+
+class TestRunOptimizeColors:
+    """End-to-end recommendation for a simple singlet."""
+
+    def test_recommends_glass(self):
+        stack = {
+            "surfaces": [
+                {"id": "s1", "type": "Glass", "radius": 100, "thickness": 5, "refractiveIndex": 1.5168,
+                 "diameter": 25, "material": "N-BK7", "description": ""},
+                {"id": "s2", "type": "Air", "radius": -100, "thickness": 95, "refractiveIndex": 1.0,
+                 "diameter": 25, "material": "Air", "description": ""},
+            ],
+            "entrancePupilDiameter": 10,
+            "wavelengths": [587.6],
+        }
+        result = run_optimize_colors(stack)
+        assert result["recommended_glass"]
+        assert result["recommended_glass"] != "N-BK7"
+        assert result["estimated_lca_reduction"] >= 0.0
+
+    def test_air_first_surface_returns_empty(self):
+        stack = {"surfaces": [
+            {"id": "s1", "type": "Air", "radius": 0, "thickness": 5, "refractiveIndex": 1.0,
+             "diameter": 25, "material": "Air", "description": ""},
+            {"id": "s2", "type": "Air", "radius": 0, "thickness": 5, "refractiveIndex": 1.0,
+             "diameter": 25, "material": "Air", "description": ""},
+        ]}
+        assert run_optimize_colors(stack) == {"recommended_glass": "", "estimated_lca_reduction": 0.0}
@@ -93,6 +93,13 @@ export async function importLensSystem(file: File): Promise<ImportLensResponse>
     return importLensSystemViaApi(file)
   }
 
+  if (ext === 'zmx') {
+    if (isPyodideEnabled()) {
+      throw new Error('ZMX import requires the backend server. Use .lensx or .json for standalone mode.')
+    }
+    return importLensSystemViaApi(file)
+  }
+
   if (ext === 'csv') {
     if (isPyodideEnabled()) {
       throw new Error('CSV import requires the backend server. Use .lensx or .json for standalone mode.')
@@ -100,5 +107,5 @@ export async function importLensSystem(file: File): Promise<ImportLensResponse>
     return importLensSystemViaApi(file)
   }
 
-  throw new Error(`Unsupported file type .${ext}. Use .lensx, .json, or .svg.`)
+  throw new Error(`Unsupported file type .${ext}. Use .lensx, .json, .zmx, or .svg.`)
 }
@@ -874,7 +874,7 @@ export function SystemEditor({
             <input
               ref={fileInputRef}
               type="file"
-              accept=".json,.svg,.csv"
+              accept=".json,.zmx,.svg,.csv"
               onChange={handleFileChange}
               className="hidden"
               aria-hidden